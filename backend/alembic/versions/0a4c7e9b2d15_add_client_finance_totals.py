@@ -0,0 +1,64 @@
+"""add client finance totals
+
+Revision ID: 0a4c7e9b2d15
+Revises: f3b6d9a27c48
+Create Date: 2026-10-19 17:21:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4c7e9b2d15'
+down_revision: Union[str, Sequence[str], None] = 'f3b6d9a27c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('clients', sa.Column('loans_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('clients', sa.Column('loans_outstanding', sa.Float(), server_default='0', nullable=False))
+    op.add_column('clients', sa.Column('loans_overdue_amount', sa.Float(), server_default='0', nullable=False))
+    op.add_column('clients', sa.Column('deposits_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('clients', sa.Column('deposits_balance', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill from existing loans/deposits/payments
+    op.execute(
+        """
+        UPDATE clients c SET
+            loans_count = coalesce(l.loans_count, 0),
+            loans_outstanding = coalesce(l.loans_outstanding, 0),
+            loans_overdue_amount = coalesce(l.loans_overdue_amount, 0),
+            deposits_count = coalesce(d.deposits_count, 0),
+            deposits_balance = coalesce(d.deposits_balance, 0)
+        FROM clients c2
+        LEFT JOIN (
+            SELECT loans.client_id,
+                   count(*) AS loans_count,
+                   sum(greatest(loans.amount - coalesce(b.paid_total, 0), 0)) AS loans_outstanding,
+                   sum(loans.overdue_amount) FILTER (WHERE loans.is_overdue) AS loans_overdue_amount
+            FROM loans
+            LEFT JOIN loan_balances b ON b.loan_id = loans.id
+            GROUP BY loans.client_id
+        ) l ON l.client_id = c2.id
+        LEFT JOIN (
+            SELECT client_id, count(*) AS deposits_count, sum(amount) AS deposits_balance
+            FROM deposits
+            GROUP BY client_id
+        ) d ON d.client_id = c2.id
+        WHERE c2.id = c.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('clients', 'deposits_balance')
+    op.drop_column('clients', 'deposits_count')
+    op.drop_column('clients', 'loans_overdue_amount')
+    op.drop_column('clients', 'loans_outstanding')
+    op.drop_column('clients', 'loans_count')
@@ -0,0 +1,52 @@
+"""notify reference changes
+
+Revision ID: 2b7f5c0e9d34
+Revises: 9e4d2a7c1f60
+Create Date: 2026-10-19 20:04:51.226718
+
+Workers keep the reference tables in memory (app/core/references.py) and
+reload them when this trigger notifies the reference_changes channel.
+Statement-level, so a bulk change sends one notification per table; the
+payload is only the table name.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7f5c0e9d34'
+down_revision: Union[str, Sequence[str], None] = '9e4d2a7c1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('jobs', 'education_levels', 'marital_statuses', 'deposit_types')
+
+NOTIFY_REFERENCE_CHANGE = """
+CREATE OR REPLACE FUNCTION notify_reference_change() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('reference_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NOTIFY_REFERENCE_CHANGE)
+    for table in TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_notify_change '
+            f'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_change()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_notify_change ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS notify_reference_change()')
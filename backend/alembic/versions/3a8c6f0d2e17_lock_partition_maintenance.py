@@ -0,0 +1,48 @@
+"""lock partition maintenance
+
+Revision ID: 3a8c6f0d2e17
+Revises: 7d3b9e1a4c58
+Create Date: 2026-10-19 22:31:14.508917
+
+ensure_future_partitions() is called by startup.py and by the scheduled
+partition task of every worker. Two calls at once could both find a month
+missing and the second CREATE TABLE failed with "relation already exists".
+The function now takes a transaction-level advisory lock first, so the
+second call waits and then finds the partitions in place.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8c6f0d2e17'
+down_revision: Union[str, Sequence[str], None] = '7d3b9e1a4c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENSURE_FUTURE_PARTITIONS = """
+CREATE OR REPLACE FUNCTION ensure_future_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    until date := (date_trunc('month', current_date) + make_interval(months => months_ahead + 1))::date;
+BEGIN
+    {lock}RETURN create_monthly_partitions('loans', current_date, until)
+         + create_monthly_partitions('deposits', current_date, until);
+END
+$$;
+"""
+
+# Held until the caller's transaction ends
+LOCK = "PERFORM pg_advisory_xact_lock(hashtext('ensure_future_partitions'));\n    "
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ENSURE_FUTURE_PARTITIONS.format(lock=LOCK))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(ENSURE_FUTURE_PARTITIONS.format(lock=''))
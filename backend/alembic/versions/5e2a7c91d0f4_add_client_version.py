@@ -0,0 +1,28 @@
+"""add client version
+
+Revision ID: 5e2a7c91d0f4
+Revises: 1df432f683a8
+Create Date: 2026-10-19 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a7c91d0f4'
+down_revision: Union[str, Sequence[str], None] = '1df432f683a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('clients', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('clients', 'version')
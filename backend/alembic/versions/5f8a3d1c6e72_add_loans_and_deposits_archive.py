@@ -0,0 +1,59 @@
+"""add loans and deposits archive
+
+Revision ID: 5f8a3d1c6e72
+Revises: 2b7f5c0e9d34
+Create Date: 2026-10-19 21:15:09.587342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f8a3d1c6e72'
+down_revision: Union[str, Sequence[str], None] = '2b7f5c0e9d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('loans_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('interest_rate', sa.Float(), nullable=False),
+    sa.Column('is_overdue', sa.Boolean(), nullable=False),
+    sa.Column('overdue_amount', sa.Float(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_loans_archive_client_id'), 'loans_archive', ['client_id'], unique=False)
+    op.create_table('deposits_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('interest_rate', sa.Float(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('final_amount', sa.Float(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['type_id'], ['deposit_types.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deposits_archive_client_id'), 'deposits_archive', ['client_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_deposits_archive_client_id'), table_name='deposits_archive')
+    op.drop_table('deposits_archive')
+    op.drop_index(op.f('ix_loans_archive_client_id'), table_name='loans_archive')
+    op.drop_table('loans_archive')
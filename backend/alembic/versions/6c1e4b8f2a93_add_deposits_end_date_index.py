@@ -0,0 +1,37 @@
+"""add deposits end_date index
+
+Revision ID: 6c1e4b8f2a93
+Revises: 0a4c7e9b2d15
+Create Date: 2026-10-19 18:02:44.913570
+
+The index is created on the partitioned table, so every monthly partition
+(including future ones) gets its own. Partitions are by start_date, so a
+maturity range query scans the index of each partition.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1e4b8f2a93'
+down_revision: Union[str, Sequence[str], None] = '0a4c7e9b2d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_deposits_end_date',
+        'deposits',
+        ['end_date'],
+        unique=False,
+        postgresql_include=['type_id', 'final_amount'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_deposits_end_date', table_name='deposits')
@@ -0,0 +1,32 @@
+"""add scheduled tasks
+
+Revision ID: 7d3b9e1a4c58
+Revises: 5f8a3d1c6e72
+Create Date: 2026-10-19 21:42:08.316524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b9e1a4c58'
+down_revision: Union[str, Sequence[str], None] = '5f8a3d1c6e72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduled_tasks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scheduled_tasks')
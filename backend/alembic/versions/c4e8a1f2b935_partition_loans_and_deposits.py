@@ -0,0 +1,161 @@
+"""partition loans and deposits by start_date
+
+Revision ID: c4e8a1f2b935
+Revises: 8b3f0d6a4c27
+Create Date: 2026-10-19 14:05:47.102393
+
+loans and deposits become tables range-partitioned by start_date with one
+partition per month plus a DEFAULT partition. Future months are created by
+ensure_future_partitions() (called from startup.py and periodically by the
+app). Old months can be detached without rewriting anything:
+
+    ALTER TABLE loans DETACH PARTITION loans_2024_01;
+
+This takes a short ACCESS EXCLUSIVE lock on loans. DETACH ... CONCURRENTLY
+is not available: PostgreSQL rejects it while a DEFAULT partition exists.
+
+The primary key becomes (id, start_date) because PostgreSQL requires the
+partition key in unique constraints; ids still come from the same sequence,
+so the ORM keeps using id alone.
+
+Existing rows are copied inside the migration, which is fine for the current
+data volume; large tables should be migrated in a maintenance window.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2b935'
+down_revision: Union[str, Sequence[str], None] = '8b3f0d6a4c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = {
+    'loans': """
+        id integer NOT NULL DEFAULT nextval('loans_id_seq'),
+        client_id integer NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        amount double precision NOT NULL,
+        interest_rate double precision NOT NULL,
+        is_overdue boolean NOT NULL,
+        overdue_amount double precision NOT NULL,
+        start_date date NOT NULL,
+        end_date date NOT NULL
+    """,
+    'deposits': """
+        id integer NOT NULL DEFAULT nextval('deposits_id_seq'),
+        client_id integer NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        type_id integer NOT NULL REFERENCES deposit_types (id),
+        amount double precision NOT NULL,
+        interest_rate double precision NOT NULL,
+        start_date date NOT NULL,
+        end_date date NOT NULL,
+        final_amount double precision NOT NULL
+    """,
+}
+
+COLUMN_NAMES = {
+    'loans': 'id, client_id, amount, interest_rate, is_overdue, overdue_amount, '
+             'start_date, end_date',
+    'deposits': 'id, client_id, type_id, amount, interest_rate, start_date, '
+                'end_date, final_amount',
+}
+
+# Creates the monthly partitions of `parent` covering [from_date, to_date).
+# Rows that already landed in the DEFAULT partition for such a month are moved
+# into the new partition before it is attached.
+CREATE_MONTHLY_PARTITIONS = """
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent text, from_date date, to_date date)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', from_date)::date;
+    month_end date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE month_start < to_date LOOP
+        month_end := (month_start + interval '1 month')::date;
+        partition_name := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent
+            );
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE start_date >= %L AND start_date < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                parent || '_default', month_start, month_end, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, month_start, month_end
+            );
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+ENSURE_FUTURE_PARTITIONS = """
+CREATE OR REPLACE FUNCTION ensure_future_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    until date := (date_trunc('month', current_date) + make_interval(months => months_ahead + 1))::date;
+BEGIN
+    RETURN create_monthly_partitions('loans', current_date, until)
+         + create_monthly_partitions('deposits', current_date, until);
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    op.execute(ENSURE_FUTURE_PARTITIONS)
+
+    for table in ('loans', 'deposits'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_unpartitioned')
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_unpartitioned_pkey')
+        op.execute(
+            f'CREATE TABLE {table} ({COLUMNS[table]}, PRIMARY KEY (id, start_date)) '
+            'PARTITION BY RANGE (start_date)'
+        )
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        op.execute(
+            f"SELECT create_monthly_partitions('{table}', "
+            f"COALESCE((SELECT min(start_date) FROM {table}_unpartitioned), current_date), "
+            "current_date)"
+        )
+        op.execute(
+            f'INSERT INTO {table} ({COLUMN_NAMES[table]}) '
+            f'SELECT {COLUMN_NAMES[table]} FROM {table}_unpartitioned'
+        )
+        op.execute(f'DROP TABLE {table}_unpartitioned')
+        op.create_index(op.f(f'ix_{table}_client_id'), table, ['client_id'], unique=False)
+
+    op.execute('SELECT ensure_future_partitions()')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('loans', 'deposits'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_partitioned')
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_partitioned_pkey')
+        op.execute(f'CREATE TABLE {table} ({COLUMNS[table]}, PRIMARY KEY (id))')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(
+            f'INSERT INTO {table} ({COLUMN_NAMES[table]}) '
+            f'SELECT {COLUMN_NAMES[table]} FROM {table}_partitioned'
+        )
+        # Drops all partitions and the partitioned index ix_<table>_client_id
+        op.execute(f'DROP TABLE {table}_partitioned')
+
+    op.execute('DROP FUNCTION ensure_future_partitions(integer)')
+    op.execute('DROP FUNCTION create_monthly_partitions(text, date, date)')
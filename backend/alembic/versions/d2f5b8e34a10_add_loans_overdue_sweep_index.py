@@ -0,0 +1,36 @@
+"""add loans overdue sweep index
+
+Revision ID: d2f5b8e34a10
+Revises: c4e8a1f2b935
+Create Date: 2026-10-19 15:21:09.584117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f5b8e34a10'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f2b935'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only loans still to be flagged are indexed, so the sweep finds its
+    # candidates without scanning the history.
+    op.create_index(
+        'ix_loans_end_date_not_overdue',
+        'loans',
+        ['end_date'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_overdue'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loans_end_date_not_overdue', table_name='loans')
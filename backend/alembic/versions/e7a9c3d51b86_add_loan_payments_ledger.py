@@ -0,0 +1,50 @@
+"""add loan payments ledger
+
+Revision ID: e7a9c3d51b86
+Revises: d2f5b8e34a10
+Create Date: 2026-10-19 16:02:44.270918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9c3d51b86'
+down_revision: Union[str, Sequence[str], None] = 'd2f5b8e34a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('loan_payments',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('loan_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('paid_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_loan_payments_paid_at_brin', 'loan_payments', ['paid_at'], unique=False, postgresql_using='brin')
+    op.create_table('loan_balances',
+    sa.Column('loan_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('paid_total', sa.Float(), nullable=False),
+    sa.Column('payments_count', sa.Integer(), nullable=False),
+    sa.Column('last_payment_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('loan_id')
+    )
+    op.create_index(op.f('ix_loan_balances_client_id'), 'loan_balances', ['client_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_loan_balances_client_id'), table_name='loan_balances')
+    op.drop_table('loan_balances')
+    op.drop_index('ix_loan_payments_paid_at_brin', table_name='loan_payments', postgresql_using='brin')
+    op.drop_table('loan_payments')
@@ -0,0 +1,36 @@
+"""add clients full_name trigram index
+
+Revision ID: f3b6d9a27c48
+Revises: e7a9c3d51b86
+Create Date: 2026-10-19 16:48:12.903155
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b6d9a27c48'
+down_revision: Union[str, Sequence[str], None] = 'e7a9c3d51b86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_clients_full_name_trgm',
+        'clients',
+        ['full_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'full_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clients_full_name_trgm', table_name='clients')
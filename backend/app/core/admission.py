@@ -0,0 +1,165 @@
+import asyncio
+import math
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import (
+    ADMISSION_EXEMPT_PATHS,
+    ADMISSION_EXPORT_CONCURRENCY,
+    ADMISSION_EXPORT_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_READ_CONCURRENCY,
+    ADMISSION_READ_QUEUE,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    ADMISSION_WRITE_CONCURRENCY,
+    ADMISSION_WRITE_QUEUE,
+)
+
+EXPORTS_PREFIX = "/api/v1/exports"
+_READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AdmissionLimit:
+    """
+    At most `concurrency` requests of a route class run at once, up to
+    `queue_size` more wait for a slot (at most queue_timeout seconds),
+    everything beyond is rejected right away.
+
+    Per worker process, like the pool it protects. concurrency=0 disables
+    the limit.
+    """
+
+    def __init__(self, concurrency: int, queue_size: int, queue_timeout: float):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_waiting = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed. False if rejected."""
+        if self._slots is None:
+            self.admitted += 1
+            return True
+
+        if self._slots.locked():
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return False
+
+            self.queued += 1
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                self.timed_out += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self.active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionControl:
+    """Route classes (reads, writes, exports) with a limit each."""
+
+    def __init__(self, retry_after: float, exempt_paths: tuple[str, ...]):
+        self.retry_after = retry_after
+        self.exempt_paths = exempt_paths
+        self.limits = {
+            "reads": AdmissionLimit(
+                ADMISSION_READ_CONCURRENCY,
+                ADMISSION_READ_QUEUE,
+                ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+            "writes": AdmissionLimit(
+                ADMISSION_WRITE_CONCURRENCY,
+                ADMISSION_WRITE_QUEUE,
+                ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+            "exports": AdmissionLimit(
+                ADMISSION_EXPORT_CONCURRENCY,
+                ADMISSION_EXPORT_QUEUE,
+                ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+        }
+
+    def classify(self, scope: Scope) -> Optional[str]:
+        """Route class of a request, None for requests that are never limited."""
+        path = scope["path"]
+        if path in self.exempt_paths:
+            return None
+        if path.startswith(EXPORTS_PREFIX):
+            return "exports"
+        return "reads" if scope["method"] in _READ_METHODS else "writes"
+
+    def stats(self) -> dict:
+        return {name: limit.stats() for name, limit in self.limits.items()}
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware: a request holds its class slot until the response
+    (including a streamed body) is finished; overflow gets 503 + Retry-After
+    instead of piling up on the connection pool.
+    """
+
+    def __init__(self, app: ASGIApp, control: AdmissionControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = self.control.classify(scope) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.control.limits[route_class]
+        if not await limit.acquire():
+            response = JSONResponse(
+                {"detail": f"Server is busy ({route_class}), retry later"},
+                status_code=503,
+                headers={"Retry-After": str(math.ceil(self.control.retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+
+admission = AdmissionControl(ADMISSION_RETRY_AFTER_SECONDS, ADMISSION_EXEMPT_PATHS)
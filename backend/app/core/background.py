@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import (
+    JOB_HISTORY_SIZE,
+    JOB_PROGRESS_FLUSH_SECONDS,
+    JOB_QUEUE_SIZE,
+    JOB_WORKERS,
+)
+from app.db.database import AsyncSessionLocal
+from app.db.models.background_job import BackgroundJobRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised by JobRunner.submit() when the queue is at capacity."""
+
+
+@dataclass
+class BackgroundJob:
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.PENDING
+    progress: float = 0.0
+    message: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def report(self, progress: float, message: Optional[str] = None) -> None:
+        """Update progress (0..1) from inside the job function."""
+        self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+JobFunc = Callable[[BackgroundJob], Awaitable[Any]]
+
+
+class JobRunner:
+    """
+    In-process async job queue served by a fixed number of worker tasks.
+
+    Job functions receive their BackgroundJob to report progress and must open
+    their own DB session (the request session is closed once 202 is returned).
+
+    Job state is mirrored to the background_jobs table (progress at most every
+    flush_interval seconds), so with several worker processes a job can be
+    looked up from any of them.
+    """
+
+    def __init__(
+        self, workers: int, queue_size: int, history_size: int, flush_interval: float
+    ):
+        self.workers = workers
+        self.history_size = history_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[tuple[BackgroundJob, JobFunc]]" = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self._jobs: "OrderedDict[str, BackgroundJob]" = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+        # Last (progress, message) written for each running job
+        self._flushed: dict[str, tuple[float, Optional[str]]] = {}
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(
+            asyncio.create_task(self._flush_progress(), name="job-progress")
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Queued jobs are never picked up again: record them as failed too
+        while not self._queue.empty():
+            job, _ = self._queue.get_nowait()
+            job.status = JobStatus.FAILED
+            job.error = "Cancelled on shutdown"
+            job.finished_at = _now()
+            self._queue.task_done()
+            await self._save(job)
+
+    async def submit(self, kind: str, func: JobFunc) -> BackgroundJob:
+        if self._queue.full():
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs)")
+
+        job = BackgroundJob(kind=kind)
+        await self._save(job)
+        try:
+            self._queue.put_nowait((job, func))
+        except asyncio.QueueFull:
+            # Filled up while the job was being saved
+            job.status = JobStatus.FAILED
+            job.error = "Job queue is full"
+            await self._save(job)
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs)")
+
+        self._jobs[job.id] = job
+        self._trim_history()
+        return job
+
+    async def get(self, job_id: str) -> Optional[BackgroundJob]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        # Submitted through another worker process
+        async with AsyncSessionLocal() as db:
+            record = await db.get(BackgroundJobRecord, job_id)
+        if record is None:
+            return None
+        return BackgroundJob(
+            kind=record.kind,
+            id=record.id,
+            status=JobStatus(record.status),
+            progress=record.progress,
+            message=record.message,
+            result=record.result,
+            error=record.error,
+            created_at=record.created_at,
+            started_at=record.started_at,
+            finished_at=record.finished_at,
+        )
+
+    def stats(self) -> dict:
+        by_status = {s.value: 0 for s in JobStatus}
+        for job in self._jobs.values():
+            by_status[job.status.value] += 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "jobs": by_status,
+        }
+
+    def _trim_history(self) -> None:
+        # Forget the oldest finished jobs; pending/running ones are always kept
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:excess]:
+            del self._jobs[job_id]
+
+    async def _save(self, job: BackgroundJob) -> None:
+        record = BackgroundJobRecord(
+            id=job.id,
+            kind=job.kind,
+            status=job.status.value,
+            progress=job.progress,
+            message=job.message,
+            result=jsonable_encoder(job.result),
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.merge(record)
+                await db.commit()
+        except Exception:
+            # Losing a status update must not fail the job itself
+            logger.exception("Could not persist background job %s", job.id)
+
+    async def _flush_progress(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for job in list(self._jobs.values()):
+                if job.status != JobStatus.RUNNING:
+                    continue
+                state = (job.progress, job.message)
+                if self._flushed.get(job.id) != state:
+                    self._flushed[job.id] = state
+                    await self._save(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job, func = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = _now()
+            await self._save(job)
+            try:
+                job.result = await func(job)
+                job.status = JobStatus.SUCCEEDED
+                job.progress = 1.0
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Cancelled on shutdown"
+                raise
+            except Exception as e:
+                logger.exception("Background job %s (%s) failed", job.id, job.kind)
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = _now()
+                self._flushed.pop(job.id, None)
+                self._queue.task_done()
+                # Also when cancelled on shutdown, or the row stays "running"
+                await asyncio.shield(self._save(job))
+
+
+job_runner = JobRunner(
+    JOB_WORKERS, JOB_QUEUE_SIZE, JOB_HISTORY_SIZE, JOB_PROGRESS_FLUSH_SECONDS
+)
@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import (
+    CLIENT_CACHE_MAX_SIZE,
+    CLIENT_CACHE_TTL_SECONDS,
+    IDEMPOTENCY_CACHE_SIZE,
+    IDEMPOTENCY_TTL_SECONDS,
+)
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with a TTL per entry.
+
+    The cache lives in a single worker process. Writes through this worker
+    invalidate their entries directly; writes through another worker do so
+    when their change event arrives over the change feed (core.events),
+    shortly after the commit. The feed clears the client caches after it
+    reconnects, and the TTL bounds staleness while it is down.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation, see epoch()/set().
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def epoch(self) -> int:
+        """
+        Take a snapshot before loading a value from the DB.
+        Passing it to set() drops the value if an invalidation happened
+        in between (the loaded value may already be stale).
+        """
+        return self._epoch
+
+    def set(self, key: Hashable, value: Any, epoch: Optional[int] = None) -> None:
+        if self.max_size <= 0:
+            return
+        if epoch is not None and epoch != self._epoch:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._epoch += 1
+        self.invalidations += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Responses of GET /clients/{id} and GET /clients/{id}/full, keyed by client id.
+client_detail_cache = TTLCache(CLIENT_CACHE_MAX_SIZE, CLIENT_CACHE_TTL_SECONDS)
+client_full_cache = TTLCache(CLIENT_CACHE_MAX_SIZE, CLIENT_CACHE_TTL_SECONDS)
+
+# Stored responses of idempotent creates, keyed by (scope, key); never
+# invalidated, a stored response does not change.
+idempotency_cache = TTLCache(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS)
+
+
+def invalidate_client(client_id: int) -> None:
+    """Drop cached responses of a client after it (or its loans/deposits) changed."""
+    client_detail_cache.invalidate(client_id)
+    client_full_cache.invalidate(client_id)
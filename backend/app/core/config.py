@@ -0,0 +1,189 @@
+"""
+Runtime settings read from environment variables (.env is loaded too).
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def env_int_map(name: str, default: dict[str, int]) -> dict[str, int]:
+    """`key=value,key=value` pairs merged over the defaults."""
+    result = dict(default)
+    for item in (os.getenv(name) or "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip():
+            result[key.strip()] = int(value)
+    return result
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- Client response cache (per worker process) ---
+CLIENT_CACHE_MAX_SIZE = env_int("CLIENT_CACHE_MAX_SIZE", 1024)
+CLIENT_CACHE_TTL_SECONDS = env_float("CLIENT_CACHE_TTL_SECONDS", 60.0)
+
+# --- Background jobs (per worker process) ---
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+JOB_QUEUE_SIZE = env_int("JOB_QUEUE_SIZE", 100)
+JOB_HISTORY_SIZE = env_int("JOB_HISTORY_SIZE", 500)
+# How often progress of running jobs is written to background_jobs
+JOB_PROGRESS_FLUSH_SECONDS = env_float("JOB_PROGRESS_FLUSH_SECONDS", 1.0)
+FORCE_DELETE_BATCH_SIZE = env_int("FORCE_DELETE_BATCH_SIZE", 1000)
+
+# --- Serving and connection pool ---
+# uvicorn --workers defaults to the same variable
+WEB_CONCURRENCY = env_int("WEB_CONCURRENCY", 1)
+# PostgreSQL max_connections and the part of it kept free for
+# migrations, psql sessions and other clients
+DB_MAX_CONNECTIONS = env_int("DB_MAX_CONNECTIONS", 100)
+DB_RESERVED_CONNECTIONS = env_int("DB_RESERVED_CONNECTIONS", 10)
+# Desired per-worker pool sizes, capped by the budget above
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT_SECONDS = env_float("DB_POOL_TIMEOUT_SECONDS", 30.0)
+# Logs every statement; use the slow query log below to find problems instead
+DB_ECHO = env_bool("DB_ECHO", False)
+# Prepared statements kept per asyncpg connection (0 disables, e.g. for pgbouncer
+# in transaction mode); the prebuilt CRUD statements all fit in the default
+DB_PREPARED_STATEMENT_CACHE_SIZE = env_int("DB_PREPARED_STATEMENT_CACHE_SIZE", 500)
+
+# --- Slow query log (per worker process, GET /admin/slow-queries) ---
+# 0 disables it
+SLOW_QUERY_THRESHOLD_MS = env_float("SLOW_QUERY_THRESHOLD_MS", 200.0)
+# Distinct (route, statement) pairs kept
+SLOW_QUERY_MAX_ENTRIES = env_int("SLOW_QUERY_MAX_ENTRIES", 200)
+# Share of slow SELECTs run again under EXPLAIN (ANALYZE, BUFFERS); this
+# executes the query a second time, so keep it low (0 disables)
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = env_float("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.0)
+
+# --- Query budgets (see core.query_budget): off | header | warn | strict ---
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn")
+
+# --- Statement timeouts (milliseconds, 0 = no limit) ---
+# Default for every connection, i.e. for API requests
+DB_STATEMENT_TIMEOUT_MS = env_int("DB_STATEMENT_TIMEOUT_MS", 5000)
+# Budgets of single routes (fnmatch patterns of the request path, the most
+# specific match wins); the env var adds to / overrides the defaults
+DB_ROUTE_STATEMENT_TIMEOUTS_MS = env_int_map(
+    "DB_ROUTE_STATEMENT_TIMEOUTS_MS",
+    {
+        "/api/v1/clients/search": 2000,
+        "/api/v1/finance/payments": 15000,
+        "/api/v1/admin/*": 60000,
+    },
+)
+# Background jobs, scheduled tasks and seeding
+DB_BACKGROUND_STATEMENT_TIMEOUT_MS = env_int("DB_BACKGROUND_STATEMENT_TIMEOUT_MS", 0)
+
+# --- Admission control per route class (per worker process) ---
+# Requests running at once / waiting for a slot; 0 concurrency disables a class.
+# The defaults keep reads + writes around the pool size (POOL_SIZE + MAX_OVERFLOW).
+ADMISSION_READ_CONCURRENCY = env_int("ADMISSION_READ_CONCURRENCY", 12)
+ADMISSION_READ_QUEUE = env_int("ADMISSION_READ_QUEUE", 100)
+ADMISSION_WRITE_CONCURRENCY = env_int("ADMISSION_WRITE_CONCURRENCY", 6)
+ADMISSION_WRITE_QUEUE = env_int("ADMISSION_WRITE_QUEUE", 50)
+ADMISSION_EXPORT_CONCURRENCY = env_int("ADMISSION_EXPORT_CONCURRENCY", 2)
+ADMISSION_EXPORT_QUEUE = env_int("ADMISSION_EXPORT_QUEUE", 4)
+# Longest wait in the queue before 503, and the Retry-After sent with it
+ADMISSION_QUEUE_TIMEOUT_SECONDS = env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 5.0)
+ADMISSION_RETRY_AFTER_SECONDS = env_float("ADMISSION_RETRY_AFTER_SECONDS", 2.0)
+# Probes and metrics must answer even when the worker is saturated
+# (and the change feed: its streams stay open, see EVENTS_MAX_SUBSCRIBERS)
+ADMISSION_EXEMPT_PATHS = ("/health", "/ready", "/api/v1/admin/metrics", "/api/v1/events")
+
+# --- Reference tables in memory (per worker process, see core.references) ---
+# Reloaded on change notifications; the TTL only bounds staleness should one
+# get lost (0: no expiry)
+REFERENCE_CACHE_TTL_SECONDS = env_float("REFERENCE_CACHE_TTL_SECONDS", 300.0)
+
+# --- Container startup (startup.py) ---
+STARTUP_DB_ATTEMPTS = env_int("STARTUP_DB_ATTEMPTS", 30)
+STARTUP_DB_MAX_DELAY_SECONDS = env_float("STARTUP_DB_MAX_DELAY_SECONDS", 2.0)
+# startup.py writes its phase timings here, /ready reports them
+STARTUP_REPORT_PATH = os.getenv("STARTUP_REPORT_PATH", "/tmp/startup-report.json")
+
+# --- Loans/deposits partition maintenance ---
+PARTITION_MONTHS_AHEAD = env_int("PARTITION_MONTHS_AHEAD", 3)
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = env_float(
+    "PARTITION_MAINTENANCE_INTERVAL_SECONDS", 6 * 60 * 60
+)
+
+# --- Overdue loans sweep ---
+OVERDUE_SWEEP_INTERVAL_SECONDS = env_float("OVERDUE_SWEEP_INTERVAL_SECONDS", 60 * 60)
+OVERDUE_SWEEP_BATCH_SIZE = env_int("OVERDUE_SWEEP_BATCH_SIZE", 1000)
+
+# --- Archival of matured loans/deposits (POST /admin/archive) ---
+# Fully paid loans and matured deposits move to the archive tables this many
+# days after their end date
+ARCHIVE_AFTER_DAYS = env_int("ARCHIVE_AFTER_DAYS", 90)
+ARCHIVE_INTERVAL_SECONDS = env_float("ARCHIVE_INTERVAL_SECONDS", 24 * 60 * 60)
+ARCHIVE_BATCH_SIZE = env_int("ARCHIVE_BATCH_SIZE", 1000)
+
+# --- Client finance totals reconciliation (POST /admin/reconcile-totals) ---
+RECONCILE_TOTALS_BATCH_SIZE = env_int("RECONCILE_TOTALS_BATCH_SIZE", 1000)
+
+# --- Client name search (pg_trgm word similarity, 0..1) ---
+CLIENT_SEARCH_THRESHOLD = env_float("CLIENT_SEARCH_THRESHOLD", 0.4)
+
+# --- Bulk loan/deposit updates (PATCH /finance/loans, PATCH /finance/deposits) ---
+# Rows one request may change; a larger match is rolled back with 400
+BULK_UPDATE_MAX_ROWS = env_int("BULK_UPDATE_MAX_ROWS", 10_000)
+
+# --- Deposit maturity calendar (GET /finance/deposits/maturities) ---
+# Longest from..to range one request may cover
+DEPOSIT_MATURITIES_MAX_DAYS = env_int("DEPOSIT_MATURITIES_MAX_DAYS", 5 * 366)
+
+# --- Loan portfolio stress test (POST /risk/stress-tests) ---
+# Worker processes per simulation (spawned for the job, then shut down)
+STRESS_TEST_PROCESSES = env_int("STRESS_TEST_PROCESSES", min(4, os.cpu_count() or 1))
+STRESS_TEST_MAX_SCENARIOS = env_int("STRESS_TEST_MAX_SCENARIOS", 200_000)
+# Scenarios per task handed to a process (and per seed, see core.stress)
+STRESS_TEST_CHUNK_SCENARIOS = env_int("STRESS_TEST_CHUNK_SCENARIOS", 1000)
+# Scenarios x loans drawn at once inside a process (bounds its memory)
+STRESS_TEST_BLOCK_ELEMENTS = env_int("STRESS_TEST_BLOCK_ELEMENTS", 4_000_000)
+# Loans fetched per round trip while loading the portfolio
+STRESS_TEST_LOAD_BATCH_SIZE = env_int("STRESS_TEST_LOAD_BATCH_SIZE", 10_000)
+
+# --- Columnar snapshots (snapshot.py, POST /exports/snapshots) ---
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+# Rows fetched from the server-side cursor and written per record batch
+SNAPSHOT_BATCH_SIZE = env_int("SNAPSHOT_BATCH_SIZE", 50_000)
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "zstd")
+# Completed snapshots kept in SNAPSHOT_DIR, older ones are deleted
+SNAPSHOT_KEEP = env_int("SNAPSHOT_KEEP", 5)
+
+# --- Change feed (LISTEN/NOTIFY, GET /events as Server-Sent Events) ---
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "bank_changes")
+# Open event streams per worker process; more get 503
+EVENTS_MAX_SUBSCRIBERS = env_int("EVENTS_MAX_SUBSCRIBERS", 500)
+# Events buffered per stream; a stream that falls behind gets a reset event
+EVENTS_QUEUE_SIZE = env_int("EVENTS_QUEUE_SIZE", 1000)
+# Recent events kept to resume a stream from its Last-Event-ID
+EVENTS_REPLAY_SIZE = env_int("EVENTS_REPLAY_SIZE", 1000)
+EVENTS_HEARTBEAT_SECONDS = env_float("EVENTS_HEARTBEAT_SECONDS", 15.0)
+EVENTS_RECONNECT_MAX_DELAY_SECONDS = env_float("EVENTS_RECONNECT_MAX_DELAY_SECONDS", 30.0)
+
+# --- Idempotency keys (POST /finance/loans, POST /finance/deposits) ---
+# Stored responses are replayed for at least this long, then purged
+IDEMPOTENCY_TTL_SECONDS = env_float("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60)
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = env_float("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", 60 * 60)
+IDEMPOTENCY_PURGE_BATCH_SIZE = env_int("IDEMPOTENCY_PURGE_BATCH_SIZE", 1000)
+# Recently stored responses kept per worker process, so most retries skip the DB
+IDEMPOTENCY_CACHE_SIZE = env_int("IDEMPOTENCY_CACHE_SIZE", 10_000)
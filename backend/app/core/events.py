@@ -0,0 +1,333 @@
+"""
+Change feed of clients, loans and deposits.
+
+Publishing: CRUD code calls record_change() inside its transaction; the
+events are sent with pg_notify just before the commit, in one statement
+per transaction (as several payloads when they exceed the 8000 byte
+limit). PostgreSQL delivers them if and only if the transaction commits.
+
+Receiving: every worker process holds one dedicated LISTEN connection
+(ChangeFeed) and fans the events out to its subscribers, the open
+GET /events streams. Events from other workers also drop the affected
+entries of this worker's client cache. The same connection listens for
+changes of the reference tables (see core.references).
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional
+
+import asyncpg
+from sqlalchemy import Text, bindparam, event, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.cache import client_detail_cache, client_full_cache, invalidate_client
+from app.core.config import (
+    EVENTS_CHANNEL,
+    EVENTS_MAX_SUBSCRIBERS,
+    EVENTS_QUEUE_SIZE,
+    EVENTS_RECONNECT_MAX_DELAY_SECONDS,
+    EVENTS_REPLAY_SIZE,
+)
+from app.core.references import REFERENCES_CHANNEL, reference_registry
+from app.db.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Identifies this worker process in payloads and event ids
+WORKER_ID = uuid.uuid4().hex[:12]
+
+# NOTIFY payloads must stay below 8000 bytes
+_MAX_PAYLOAD_BYTES = 7500
+
+_PENDING = "pending_change_events"
+
+# All payloads of a transaction in one statement
+_NOTIFY = text(
+    "SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload"
+).bindparams(bindparam("payloads", type_=ARRAY(Text)))
+
+HEALTH_CHECK_SECONDS = 30.0
+
+
+# --- Publishing ---
+
+
+def record_change(
+    db,
+    entity: str,
+    op: str,
+    ids: Iterable[Optional[int]],
+    client_id: Optional[int] = None,
+) -> None:
+    """
+    Queue change events ("client" | "loan" | "deposit", "created" |
+    "updated" | "deleted" | "archived") for the transaction of `db`
+    (Session or AsyncSession). For clients the id is the client id.
+    """
+    pending = db.info.setdefault(_PENDING, [])
+    for entity_id in ids:
+        pending.append(
+            {
+                "entity": entity,
+                "op": op,
+                "id": entity_id,
+                "client_id": entity_id if entity == "client" else client_id,
+            }
+        )
+
+
+def _payloads(events: list[dict]) -> list[str]:
+    def payload(batch: list[str]) -> str:
+        return f'{{"origin": "{WORKER_ID}", "events": [{", ".join(batch)}]}}'
+
+    payloads, batch, size = [], [], len(payload([]))
+    for change in events:
+        encoded = json.dumps(change)
+        if batch and size + len(encoded) + 2 > _MAX_PAYLOAD_BYTES:
+            payloads.append(payload(batch))
+            batch, size = [], len(payload([]))
+        batch.append(encoded)
+        size += len(encoded) + 2
+    if batch:
+        payloads.append(payload(batch))
+    return payloads
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_changes(session) -> None:
+    events = session.info.pop(_PENDING, None)
+    if events:
+        session.execute(_NOTIFY, {"channel": EVENTS_CHANNEL, "payloads": _payloads(events)})
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING, None)
+
+
+# --- Receiving ---
+
+
+def listener_dsn() -> str:
+    """DATABASE_URL as a plain libpq URL for asyncpg."""
+    return make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+class Subscriber:
+    def __init__(self, client_ids: Optional[set[int]], queue_size: int):
+        self.client_ids = client_ids
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, change: dict) -> bool:
+        return (
+            change["type"] == "reset"
+            or self.client_ids is None
+            or change["data"]["client_id"] in self.client_ids
+        )
+
+    def offer(self, change: dict) -> bool:
+        """False if the subscriber fell behind (its queue is then reset)."""
+        try:
+            self.queue.put_nowait(change)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_reset_event("lagging"))
+            return False
+
+
+def _reset_event(reason: str) -> dict:
+    # No id: a reset is not replayable, clients refetch instead
+    return {"id": None, "type": "reset", "data": {"reason": reason}}
+
+
+class ChangeFeed:
+    """
+    One LISTEN connection per worker process, fanned out to subscribers.
+
+    Reconnects with backoff when the connection drops; events published
+    meanwhile are lost, so subscribers then get a reset event (refetch
+    everything) and the client caches are cleared.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        max_subscribers: int,
+        queue_size: int,
+        replay_size: int,
+        reconnect_max_delay: float,
+    ):
+        self.channel = channel
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.reconnect_max_delay = reconnect_max_delay
+        self._subscribers: set[Subscriber] = set()
+        self._replay: deque[tuple[int, dict]] = deque(maxlen=replay_size)
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self._was_connected = False
+        self.received = 0
+        self.delivered = 0
+        self.lagging = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen(), name="change-feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self) -> None:
+        delay = 0.5
+        while True:
+            lost = asyncio.Event()
+            conn = None
+            try:
+                conn = await asyncpg.connect(listener_dsn(), timeout=10)
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                await conn.add_listener(REFERENCES_CHANNEL, self._on_reference_change)
+                if self._was_connected:
+                    self.reconnects += 1
+                self.connected = self._was_connected = True
+                delay = 0.5
+                # Anything published while we were not listening is lost
+                self._resync()
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), HEALTH_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        # A dead TCP connection is only noticed on use
+                        await conn.fetchval("SELECT 1", timeout=10)
+                logger.warning("Change feed connection lost, reconnecting")
+                continue
+            except (
+                OSError,
+                asyncio.TimeoutError,
+                asyncpg.PostgresError,
+                asyncpg.InterfaceError,
+            ) as e:
+                logger.warning("Change feed connection failed (%r), retry in %.1fs", e, delay)
+            except Exception:
+                # Anything else must not end the feed either: this worker
+                # would silently stop seeing other workers' writes
+                logger.exception("Change feed failed, retry in %.1fs", delay)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_delay)
+
+    def _resync(self) -> None:
+        """After a gap in the feed: drop caches, subscribers refetch."""
+        client_detail_cache.clear()
+        client_full_cache.clear()
+        reference_registry.invalidate()
+        for subscriber in list(self._subscribers):
+            subscriber.offer(_reset_event("reconnected"))
+
+    def _on_reference_change(self, conn, pid: int, channel: str, payload: str) -> None:
+        logger.info("Reference table %s changed, reloading", payload)
+        reference_registry.invalidate()
+
+    def _on_notify(self, conn, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change event: %.200s", payload)
+            return
+
+        remote = message.get("origin") != WORKER_ID
+        for data in message.get("events", []):
+            self.received += 1
+            # Local writes already invalidated the cache
+            if remote and data.get("client_id") is not None:
+                invalidate_client(data["client_id"])
+            self._seq += 1
+            change = {"id": f"{WORKER_ID}-{self._seq}", "type": "change", "data": data}
+            self._replay.append((self._seq, change))
+            self._fan_out(change)
+
+    def _fan_out(self, change: dict) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber.wants(change):
+                if subscriber.offer(change):
+                    self.delivered += 1
+                else:
+                    self.lagging += 1
+
+    def _missed(self, last_event_id: str) -> Optional[list[dict]]:
+        """Events after last_event_id, None if they are no longer known."""
+        origin, _, seq = last_event_id.rpartition("-")
+        if origin != WORKER_ID or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        seq = int(seq)
+        oldest = self._replay[0][0] if self._replay else self._seq + 1
+        if oldest > seq + 1:
+            return None  # Some were dropped from the replay buffer
+        return [change for n, change in self._replay if n > seq]
+
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    @asynccontextmanager
+    async def subscribe(
+        self, client_ids: Optional[set[int]] = None, last_event_id: Optional[str] = None
+    ) -> AsyncIterator[Subscriber]:
+        """
+        Register a subscriber for the duration of the block. With a
+        last_event_id the missed events are queued first (or a reset event
+        when they are not in the replay buffer of this worker any more).
+        """
+        subscriber = Subscriber(client_ids, self.queue_size)
+        if last_event_id:
+            missed = self._missed(last_event_id)
+            if missed is None:
+                subscriber.offer(_reset_event("resume"))
+            else:
+                for change in missed:
+                    if subscriber.wants(change):
+                        subscriber.offer(change)
+        if not self.connected:
+            subscriber.offer(_reset_event("disconnected"))
+
+        self._subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            "received": self.received,
+            "delivered": self.delivered,
+            "lagging": self.lagging,
+            "reconnects": self.reconnects,
+        }
+
+
+change_feed = ChangeFeed(
+    EVENTS_CHANNEL,
+    EVENTS_MAX_SUBSCRIBERS,
+    EVENTS_QUEUE_SIZE,
+    EVENTS_REPLAY_SIZE,
+    EVENTS_RECONNECT_MAX_DELAY_SECONDS,
+)
@@ -0,0 +1,130 @@
+import contextvars
+import json
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import QUERY_BUDGET_MODE
+
+logger = logging.getLogger(__name__)
+
+# Statements executed for the current request; tasks started by the request
+# (e.g. coalesced loads) share the same counter
+_request_queries: contextvars.ContextVar[Optional[list[int]]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+
+def query_budget(limit: Optional[int]) -> Callable:
+    """
+    Declare how many SQL statements an endpoint may execute per request,
+    whatever the number of loans/deposits involved. None marks endpoints
+    that run batches on purpose (their count grows with the data).
+
+    Put it under the @router decorator:
+
+        @router.get("/{client_id}")
+        @query_budget(5)
+        async def read_client(...): ...
+    """
+
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.query_budget = limit
+        return endpoint
+
+    return decorate
+
+
+def endpoint_query_budget(endpoint: Callable) -> Optional[int]:
+    return getattr(endpoint, "query_budget", None)
+
+
+def install(engine: Engine) -> None:
+    """Count cursor executions of a (sync) engine per request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+class QueryBudgetMiddleware:
+    """
+    Pure ASGI middleware counting the statements of every request.
+
+    QUERY_BUDGET_MODE:
+    - off: nothing is counted
+    - header: X-Query-Count / X-Query-Budget response headers
+    - warn: headers, and a warning log when a budget is exceeded
+    - strict: headers, and a 500 instead of the response when a budget is
+      exceeded (for development and benchmarks.query_budgets)
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _request_queries.set(counter)
+        suppress_body = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal suppress_body
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                budget = endpoint_query_budget(route.endpoint) if route else None
+                count = counter[0]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(count).encode()))
+                if budget is not None:
+                    headers.append((b"x-query-budget", str(budget).encode()))
+
+                if budget is not None and count > budget:
+                    logger.warning(
+                        "Query budget exceeded: %s %s ran %d statements (budget %d)",
+                        scope["method"],
+                        route.path,
+                        count,
+                        budget,
+                    )
+                    if self.mode == "strict":
+                        suppress_body = True
+                        body = json.dumps(
+                            {
+                                "detail": f"Query budget exceeded: {count} statements, "
+                                f"budget {budget}"
+                            }
+                        ).encode()
+                        await send(
+                            {
+                                "type": "http.response.start",
+                                "status": 500,
+                                "headers": [
+                                    (b"content-type", b"application/json"),
+                                    (b"content-length", str(len(body)).encode()),
+                                    (b"x-query-count", str(count).encode()),
+                                    (b"x-query-budget", str(budget).encode()),
+                                ],
+                            }
+                        )
+                        await send({"type": "http.response.body", "body": body})
+                        return
+
+                message = {**message, "headers": headers}
+            elif suppress_body:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
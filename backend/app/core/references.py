@@ -0,0 +1,135 @@
+"""
+Reference tables (jobs, education levels, marital statuses, deposit types)
+kept in memory by every worker process.
+
+They hold a handful of rows and change rarely (by hand, through SQL), so
+client responses attach job / education_level / marital_status and the
+deposit types by id from here instead of loading them with every read.
+
+A trigger on the four tables notifies REFERENCES_CHANNEL on every change
+(migration 2b7f5c0e9d34); the change feed's LISTEN connection calls
+invalidate(), as it does after reconnecting. Every invalidation bumps the
+registry version and starts a reload; a load that began under an older
+version is discarded. REFERENCE_CACHE_TTL_SECONDS bounds the staleness
+should a notification get lost anyway.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Optional
+
+from app.core.cache import client_detail_cache, client_full_cache
+from app.core.config import REFERENCE_CACHE_TTL_SECONDS
+from app.crud import references as crud_ref
+from app.db.database import AsyncSessionLocal
+from app.schemas.common import ORMBase
+from app.schemas.references import DepositType, EducationLevel, Job, MaritalStatus
+
+logger = logging.getLogger(__name__)
+
+# Notified by the trigger of the reference tables (fixed in the migration)
+REFERENCES_CHANNEL = "reference_changes"
+
+# Table name -> (loader, response schema)
+REFERENCE_TABLES = {
+    "jobs": (crud_ref.get_jobs, Job),
+    "education_levels": (crud_ref.get_education_levels, EducationLevel),
+    "marital_statuses": (crud_ref.get_marital_statuses, MaritalStatus),
+    "deposit_types": (crud_ref.get_deposit_types, DepositType),
+}
+
+
+class ReferenceRegistry:
+    """
+    Reference rows by table and id, as response schemas.
+
+    Call `await ensure()` before get()/items(): it returns at once while
+    the registry is current, otherwise it waits for the reload.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._tables: dict[str, dict[int, ORMBase]] = {}
+        self._loaded_version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._loading: Optional[asyncio.Task] = None
+        self.loads = 0
+        self.invalidations = 0
+        self.misses = 0
+
+    def fresh(self) -> bool:
+        expired = self.ttl > 0 and time.monotonic() - self._loaded_at >= self.ttl
+        return self._loaded_version == self.version and not expired
+
+    async def ensure(self) -> None:
+        while not self.fresh():
+            await asyncio.shield(self._reload())
+
+    def _reload(self) -> asyncio.Task:
+        if self._loading is None or self._loading.done():
+            # Own context: the load is shared by every waiting request, so
+            # it is not counted in the query budget of the one that started it
+            self._loading = asyncio.create_task(self._load(), context=contextvars.Context())
+            self._loading.add_done_callback(self._log_failure)
+        return self._loading
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Reference tables reload failed: %r", task.exception())
+
+    async def _load(self) -> None:
+        version = self.version
+        tables = {}
+        async with AsyncSessionLocal() as db:
+            for name, (loader, schema) in REFERENCE_TABLES.items():
+                tables[name] = {row.id: schema.model_validate(row) for row in await loader(db)}
+        if version == self.version:
+            self._tables = tables
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def invalidate(self) -> None:
+        """The reference tables changed: reload them (in the background)."""
+        self.version += 1
+        self.invalidations += 1
+        # Cached client responses embed reference rows
+        client_detail_cache.clear()
+        client_full_cache.clear()
+        try:
+            self._reload()
+        except RuntimeError:
+            pass  # No running event loop: the next ensure() loads
+
+    def get(self, table: str, ref_id: Optional[int]) -> Optional[ORMBase]:
+        if ref_id is None:
+            return None
+        item = self._tables.get(table, {}).get(ref_id)
+        if item is None:
+            # The row exists (foreign key), so it was added after the load
+            # and its notification is still on the way
+            self.misses += 1
+            if self.fresh():
+                self.invalidate()
+        return item
+
+    def items(self, table: str) -> list:
+        """All rows of a table, ordered by id."""
+        return list(self._tables.get(table, {}).values())
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "fresh": self.fresh(),
+            "rows": {name: len(rows) for name, rows in self._tables.items()},
+            "ttl_seconds": self.ttl,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "misses": self.misses,
+        }
+
+
+reference_registry = ReferenceRegistry(REFERENCE_CACHE_TTL_SECONDS)
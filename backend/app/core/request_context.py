@@ -0,0 +1,23 @@
+import contextvars
+from typing import Optional
+
+from starlette.types import Scope
+
+# ASGI scope of the request being served (set by RequestTimeoutMiddleware);
+# tasks started by the request inherit it
+current_scope: contextvars.ContextVar[Optional[Scope]] = contextvars.ContextVar(
+    "current_scope", default=None
+)
+
+
+def current_route() -> Optional[str]:
+    """
+    "METHOD /route/{template}" of the current request, the raw path before
+    routing, None outside of requests (background jobs, scheduled tasks).
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
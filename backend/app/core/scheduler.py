@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import BackgroundSessionLocal, engine
+from app.db.models.scheduled_task import ScheduledTask
+
+logger = logging.getLogger(__name__)
+
+TaskFunc = Callable[[AsyncSession], Awaitable[Any]]
+
+# Database time and seconds since the last run of a task (NULL: never ran)
+_SINCE_LAST_RUN = select(
+    func.now(),
+    select(func.extract("epoch", func.now() - ScheduledTask.last_run_at))
+    .where(ScheduledTask.name == bindparam("name"))
+    .scalar_subquery(),
+)
+_insert_run = pg_insert(ScheduledTask).values(
+    name=bindparam("name"), last_run_at=bindparam("started_at")
+)
+_RECORD_RUN = _insert_run.on_conflict_do_update(
+    index_elements=[ScheduledTask.name],
+    set_={"last_run_at": _insert_run.excluded.last_run_at},
+)
+
+
+class PeriodicTask:
+    """
+    Runs `func(db)` every `interval` seconds inside a worker process.
+
+    Every worker schedules the task. A run only happens in the worker that
+    gets the PostgreSQL advisory lock named after the task (no two runs at
+    once), and only when the last successful run, recorded in
+    scheduled_tasks, started at least `interval` seconds ago: with several
+    workers the task still runs about once per interval, not once per worker.
+    """
+
+    def __init__(self, name: str, interval: float, func: TaskFunc):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.lock_key = zlib.crc32(name.encode())
+        self.runs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop(), name=f"periodic-{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> Any:
+        """
+        Run now if no other worker is running this task and no worker ran it
+        in the last interval. Returns the task result, or None if skipped.
+        """
+        # Session-level advisory lock on a dedicated connection: the task
+        # itself may commit several times through its own session.
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(
+                select(func.pg_try_advisory_lock(self.lock_key))
+            )
+            if not locked:
+                return None
+            try:
+                started_at, since_last_run = (
+                    await lock_conn.execute(_SINCE_LAST_RUN, {"name": self.name})
+                ).one()
+                await lock_conn.commit()
+                if since_last_run is not None and since_last_run < self.interval:
+                    return None
+
+                started = time.perf_counter()
+                async with BackgroundSessionLocal() as db:
+                    result = await self.func(db)
+                    await db.commit()
+                # Only successful runs count: a failed one is retried by the
+                # next worker whose timer fires
+                await lock_conn.execute(
+                    _RECORD_RUN, {"name": self.name, "started_at": started_at}
+                )
+                await lock_conn.commit()
+                self.runs += 1
+                self.last_run_at = time.time()
+                self.last_duration = round(time.perf_counter() - started, 3)
+                self.last_result = result
+                self.last_error = None
+                return result
+            finally:
+                await lock_conn.scalar(select(func.pg_advisory_unlock(self.lock_key)))
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception("Periodic task %s failed", self.name)
+                self.last_error = str(e)
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_seconds": self.last_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    def __init__(self):
+        self.tasks: dict[str, PeriodicTask] = {}
+
+    def add(self, name: str, interval: float, func: TaskFunc) -> PeriodicTask:
+        task = PeriodicTask(name, interval, func)
+        self.tasks[name] = task
+        return task
+
+    def start(self) -> None:
+        for task in self.tasks.values():
+            task.start()
+
+    async def stop(self) -> None:
+        for task in self.tasks.values():
+            await task.stop()
+
+    def stats(self) -> dict:
+        return {name: task.stats() for name, task in self.tasks.items()}
+
+
+scheduler = Scheduler()
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent reads within a worker process.
+
+    The first caller for a key starts the load in its own task; callers
+    that arrive while it is running await the same task instead of
+    querying the DB again. Finished loads are forgotten, so a later call
+    starts a fresh one (caching is up to the caller).
+
+    The load outlives a cancelled caller (e.g. a disconnected client) so
+    the others still get the result. It must therefore open its own DB
+    session instead of using the caller's.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(load())
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self._calls[key] = task
+            self.loads += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+        }
+
+
+# Client reads (GET /clients/, /clients/{id}, /clients/{id}/full)
+client_flights = SingleFlight()
@@ -0,0 +1,162 @@
+import logging
+import random
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import (
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    SLOW_QUERY_MAX_ENTRIES,
+    SLOW_QUERY_THRESHOLD_MS,
+)
+from app.core.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+_EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) "
+
+# EXPLAIN ANALYZE executes the statement again: only plain reads qualify.
+# Row locks and functions with side effects (notifications, advisory locks,
+# settings, partition maintenance) would take effect twice.
+_NOT_EXPLAINED = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b"
+    r"|\b(pg_notify|pg_\w*advisory\w*|set_config|ensure_future_partitions|nextval|setval)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def _explainable(statement: str) -> bool:
+    """A plain SELECT: no row locks, no function calls with side effects."""
+    return statement.lstrip()[:6].upper() == "SELECT" and not _NOT_EXPLAINED.search(
+        statement
+    )
+
+
+class SlowQueryLog:
+    """
+    Statements slower than threshold_ms, aggregated per (route, statement).
+
+    Per worker process. Parameters are never stored (they hold client data),
+    only the statement text. A sampled share of slow SELECTs is run again
+    under EXPLAIN (ANALYZE, BUFFERS) and the plan kept with the entry;
+    statements that lock rows or have side effects are never run again.
+    """
+
+    def __init__(self, threshold_ms: float, max_entries: int, explain_sample_rate: float):
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self.explain_sample_rate = explain_sample_rate
+        self._entries: dict[tuple[Optional[str], str], dict] = {}
+        self.recorded = 0
+        self.explained = 0
+
+    def install(self, engine: Engine) -> None:
+        """Listen to cursor executions of a (sync) engine."""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.slow_query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get("explaining"):
+            return
+
+        duration_ms = (time.perf_counter() - context.slow_query_started) * 1000
+        if self.threshold_ms <= 0 or duration_ms < self.threshold_ms:
+            return
+
+        route = current_route()
+        entry = self._record(route, statement, duration_ms)
+        logger.warning(
+            "Slow query (%.0f ms) in %s: %s",
+            duration_ms,
+            route or "background",
+            " ".join(statement.split())[:500],
+        )
+
+        if (
+            not executemany
+            and _explainable(statement)
+            and random.random() < self.explain_sample_rate
+        ):
+            entry["plan"] = self._explain(conn, statement, parameters)
+            entry["plan_duration_ms"] = round(duration_ms, 1)
+
+    def _record(self, route: Optional[str], statement: str, duration_ms: float) -> dict:
+        key = (route, statement)
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_entries:
+                # Make room by dropping the entry that cost the least so far
+                del self._entries[
+                    min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                ]
+            entry = self._entries[key] = {
+                "route": route,
+                "statement": statement,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_at": None,
+                "plan": None,
+                "plan_duration_ms": None,
+            }
+
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_at"] = time.time()
+        self.recorded += 1
+        return entry
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        """
+        Run the statement again under EXPLAIN ANALYZE, in a savepoint of the
+        same transaction so a failure (e.g. statement_timeout) doesn't abort it.
+        """
+        conn.info["explaining"] = True
+        try:
+            with conn.begin_nested():
+                result = conn.exec_driver_sql(_EXPLAIN_PREFIX + statement, parameters)
+                plan = "\n".join(row[0] for row in result)
+            self.explained += 1
+            return plan
+        except Exception as e:
+            logger.warning("EXPLAIN of slow query failed: %r", e)
+            return None
+        finally:
+            conn.info["explaining"] = False
+
+    def top(self, limit: int) -> list[dict]:
+        """Entries with the highest total time first."""
+        entries = sorted(self._entries.values(), key=lambda e: e["total_ms"], reverse=True)
+        return [
+            {
+                **entry,
+                "total_ms": round(entry["total_ms"], 1),
+                "max_ms": round(entry["max_ms"], 1),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 1),
+            }
+            for entry in entries[:limit]
+        ]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "entries": len(self._entries),
+            "recorded": self.recorded,
+            "explained": self.explained,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_MAX_ENTRIES, SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+)
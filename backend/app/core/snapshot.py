@@ -0,0 +1,213 @@
+"""
+Columnar snapshots of the main tables for analytics.
+
+Every table is streamed from a server-side cursor in SNAPSHOT_BATCH_SIZE
+rows and written batch by batch to a Parquet (or Arrow IPC) file with an
+explicit Arrow schema, so memory stays flat whatever the table size. All
+tables are read in one REPEATABLE READ transaction: the files of a snapshot
+are consistent with each other.
+
+A snapshot is a directory SNAPSHOT_DIR/<name>/ with one file per table and
+a manifest.json (row counts, column types). It is written as
+<name>.partial and renamed when complete, so readers never see half a
+snapshot.
+"""
+import asyncio
+import json
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer, String, Table, select
+
+from app.core.config import (
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_COMPRESSION,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP,
+)
+from app.db.database import BackgroundSessionLocal
+from app.db.models import (
+    Client,
+    Deposit,
+    DepositArchive,
+    DepositType,
+    EducationLevel,
+    Job,
+    Loan,
+    LoanArchive,
+    MaritalStatus,
+)
+
+SNAPSHOT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+SNAPSHOT_TABLES: dict[str, Table] = {
+    model.__tablename__: model.__table__
+    for model in (
+        Client,
+        Loan,
+        Deposit,
+        LoanArchive,
+        DepositArchive,
+        Job,
+        EducationLevel,
+        MaritalStatus,
+        DepositType,
+    )
+}
+
+MANIFEST = "manifest.json"
+
+
+def _arrow_type(column) -> pa.DataType:
+    # BigInteger before Integer (subclass)
+    if isinstance(column.type, BigInteger):
+        return pa.int64()
+    if isinstance(column.type, Integer):
+        return pa.int32()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, String):
+        return pa.string()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Date):
+        return pa.date32()
+    raise TypeError(f"No Arrow type for {column.table.name}.{column.name} ({column.type})")
+
+
+def arrow_schema(table: Table) -> pa.Schema:
+    """Arrow schema with the column order, types and nullability of the table."""
+    return pa.schema(
+        [pa.field(c.name, _arrow_type(c), nullable=c.nullable) for c in table.columns]
+    )
+
+
+def _open_writer(path: Path, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(str(path), schema, compression=SNAPSHOT_COMPRESSION)
+    return pa.ipc.new_file(
+        str(path), schema, options=pa.ipc.IpcWriteOptions(compression=SNAPSHOT_COMPRESSION)
+    )
+
+
+def _write_rows(writer, schema: pa.Schema, rows: Sequence[tuple]) -> None:
+    columns = list(zip(*rows))
+    writer.write_batch(
+        pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        )
+    )
+
+
+async def _export_table(db, table: Table, path: Path, fmt: str) -> int:
+    """Stream one table into `path`; file writes run in a thread."""
+    schema = arrow_schema(table)
+    result = await db.stream(
+        select(table)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+    )
+    writer = await asyncio.to_thread(_open_writer, path, schema, fmt)
+    rows_written = 0
+    try:
+        async for rows in result.partitions():
+            await asyncio.to_thread(_write_rows, writer, schema, rows)
+            rows_written += len(rows)
+    finally:
+        await asyncio.to_thread(writer.close)
+    return rows_written
+
+
+async def export_snapshot(
+    fmt: str = "parquet",
+    tables: Optional[Sequence[str]] = None,
+    directory: str = SNAPSHOT_DIR,
+    on_progress: Optional[Callable[[float, str], None]] = None,
+) -> dict:
+    """
+    Write a snapshot of `tables` (default: all of SNAPSHOT_TABLES) and
+    return its manifest. Raises ValueError for an unknown format or table.
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    tables = list(tables or SNAPSHOT_TABLES)
+    unknown = [t for t in tables if t not in SNAPSHOT_TABLES]
+    if unknown:
+        raise ValueError(f"Неизвестные таблицы: {unknown}")
+
+    started = time.perf_counter()
+    created_at = datetime.now(timezone.utc)
+    name = f"{created_at:%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+    root = Path(directory)
+    partial = root / f"{name}.partial"
+    partial.mkdir(parents=True)
+
+    manifest = {
+        "name": name,
+        "created_at": created_at.isoformat(),
+        "format": fmt,
+        "tables": {},
+    }
+    try:
+        async with BackgroundSessionLocal() as db:
+            # One snapshot of the database for all tables
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            for i, table_name in enumerate(tables):
+                table = SNAPSHOT_TABLES[table_name]
+                file_name = table_name + SNAPSHOT_FORMATS[fmt]
+                rows = await _export_table(db, table, partial / file_name, fmt)
+                manifest["tables"][table_name] = {
+                    "file": file_name,
+                    "rows": rows,
+                    "bytes": (partial / file_name).stat().st_size,
+                    "columns": {f.name: str(f.type) for f in arrow_schema(table)},
+                }
+                if on_progress:
+                    on_progress((i + 1) / len(tables), f"{table_name}: {rows} rows")
+
+        manifest["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        (partial / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        partial.rename(root / name)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+
+    _prune(root, SNAPSHOT_KEEP)
+    return manifest
+
+
+def list_snapshots(directory: str = SNAPSHOT_DIR) -> list[dict]:
+    """Manifests of the completed snapshots, newest first."""
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    manifests = []
+    for path in root.glob(f"*/{MANIFEST}"):
+        try:
+            manifests.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(manifests, key=lambda m: m["created_at"], reverse=True)
+
+
+def snapshot_file(name: str, table: str, directory: str = SNAPSHOT_DIR) -> Optional[Path]:
+    """Path of a table file of a completed snapshot (None if there is none)."""
+    for manifest in list_snapshots(directory):
+        if manifest["name"] == name and table in manifest["tables"]:
+            return Path(directory) / name / manifest["tables"][table]["file"]
+    return None
+
+
+def _prune(root: Path, keep: int) -> None:
+    for manifest in list_snapshots(str(root))[keep:]:
+        shutil.rmtree(root / manifest["name"], ignore_errors=True)
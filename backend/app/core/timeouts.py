@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import logging
+from fnmatch import fnmatchcase
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import DB_ROUTE_STATEMENT_TIMEOUTS_MS, DB_STATEMENT_TIMEOUT_MS
+from app.core.request_context import current_scope
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL query_canceled (statement_timeout or a cancel request)
+QUERY_CANCELED = "57014"
+
+# statement_timeout of the request being served (ms); read by the session
+# listener in app.db.database, inherited by tasks the request starts
+request_statement_timeout: contextvars.ContextVar[Optional[int]] = (
+    contextvars.ContextVar("request_statement_timeout", default=None)
+)
+
+# Per worker process, reported by /admin/metrics
+counters = {"statement_timeouts": 0, "disconnect_cancellations": 0}
+
+# Most specific (longest) pattern first
+_ROUTE_TIMEOUTS = sorted(
+    DB_ROUTE_STATEMENT_TIMEOUTS_MS.items(), key=lambda item: len(item[0]), reverse=True
+)
+
+
+def route_statement_timeout(path: str) -> int:
+    """statement_timeout budget (ms) of a request path."""
+    for pattern, timeout in _ROUTE_TIMEOUTS:
+        if fnmatchcase(path, pattern):
+            return timeout
+    return DB_STATEMENT_TIMEOUT_MS
+
+
+class RequestTimeoutMiddleware:
+    """
+    Pure ASGI middleware that
+    - makes the request scope available to DB code (core.request_context),
+    - sets the statement_timeout budget of the route for the request's DB work,
+    - cancels the request (and with it the running asyncpg query, which
+      releases the connection) when the client disconnects before the
+      response is complete.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope_token = current_scope.set(scope)
+        token = request_statement_timeout.set(route_statement_timeout(scope["path"]))
+        try:
+            await self._run(scope, receive, send)
+        finally:
+            request_statement_timeout.reset(token)
+            current_scope.reset(scope_token)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Incoming messages are read by a watcher and handed to the app
+        # through a queue, so a disconnect is noticed while the app is busy.
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, messages.get, send_wrapper))
+
+        async def watch() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete and not app_task.done():
+                        disconnected = True
+                        counters["disconnect_cancellations"] += 1
+                        logger.info(
+                            "Client disconnected, cancelling %s %s",
+                            scope["method"],
+                            scope["path"],
+                        )
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise  # we were cancelled ourselves (e.g. shutdown)
+            # Nobody is left to send a response to
+        finally:
+            watcher.cancel()
+
+
+async def query_timeout_handler(request: Request, exc: DBAPIError):
+    """504 for queries stopped by statement_timeout, anything else stays a 500."""
+    if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED:
+        raise exc
+    counters["statement_timeouts"] += 1
+    timeout = route_statement_timeout(request.url.path)
+    return JSONResponse(
+        status_code=504,
+        content={
+            "detail": f"Database query exceeded the {timeout} ms budget of this endpoint"
+        },
+    )
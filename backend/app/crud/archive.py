@@ -0,0 +1,155 @@
+from datetime import date, timedelta
+from typing import Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, exists, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import invalidate_client
+from app.core.events import record_change
+from app.crud.client import bump_client_versions, refresh_client_totals
+from app.db.models.archive import DepositArchive, LoanArchive
+from app.db.models.deposit import Deposit
+from app.db.models.loan import Loan
+from app.db.models.loan_payment import LoanBalance
+
+
+def _archivable(model, *conditions) -> list:
+    """
+    WHERE clauses of rows to archive, shared by the candidate and the move
+    statement: a candidate the move skips would be selected again forever.
+    """
+    return [model.end_date < bindparam("cutoff"), *conditions]
+
+
+def _candidates_statement(model, *conditions):
+    """Ids and clients of the next batch of rows to archive (no row locks)."""
+    return (
+        select(model.id, model.client_id)
+        .where(*_archivable(model, *conditions))
+        .limit(bindparam("batch_size"))
+    )
+
+
+def _move_statement(model, archive, *conditions):
+    """
+    One batch: DELETE ... RETURNING the candidate rows from the hot table
+    and INSERT them into the archive table, in a single statement. The
+    conditions are checked again, a candidate may have changed meanwhile.
+    """
+    columns = [column.name for column in model.__table__.columns]
+    moved = (
+        delete(model)
+        .where(
+            model.id.in_(bindparam("ids", expanding=True)),
+            *_archivable(model, *conditions),
+        )
+        .returning(*model.__table__.columns)
+        .cte("moved")
+    )
+    # Core insert: the ORM bulk insert path doesn't take from_select()
+    archive_table = archive.__table__
+    return (
+        insert(archive_table)
+        .from_select(columns, select(*(moved.c[name] for name in columns)))
+        .returning(archive_table.c.id, archive_table.c.client_id)
+        .add_cte(moved)
+    )
+
+
+# Fully paid loans (per loan_balances) and matured deposits
+_LOAN_PAID = exists().where(LoanBalance.loan_id == Loan.id, LoanBalance.paid_total >= Loan.amount)
+_ARCHIVE_STATEMENTS = {
+    "loan": (
+        _candidates_statement(Loan, _LOAN_PAID),
+        _move_statement(Loan, LoanArchive, _LOAN_PAID),
+    ),
+    "deposit": (
+        _candidates_statement(Deposit),
+        _move_statement(Deposit, DepositArchive),
+    ),
+}
+
+_ARCHIVED_LOANS = (
+    select(LoanArchive)
+    .where(LoanArchive.client_id == bindparam("client_id"))
+    .order_by(LoanArchive.end_date.desc(), LoanArchive.id)
+)
+_ARCHIVED_DEPOSITS = (
+    select(DepositArchive)
+    .where(DepositArchive.client_id == bindparam("client_id"))
+    .order_by(DepositArchive.end_date.desc(), DepositArchive.id)
+)
+
+
+async def archive_matured(
+    db: AsyncSession, as_of: date, after_days: int, batch_size: int
+) -> dict:
+    """
+    Move loans that are fully paid and deposits that matured more than
+    `after_days` days before `as_of` to loans_archive / deposits_archive.
+
+    Works in batches of at most batch_size rows, each committed separately
+    with the versions and finance totals of its clients, and announced as
+    "archived" change events.
+    """
+    cutoff = as_of - timedelta(days=after_days)
+    counts = {"loan": 0, "deposit": 0}
+    batches = 0
+    client_ids: set[int] = set()
+
+    for entity, (candidates_statement, move_statement) in _ARCHIVE_STATEMENTS.items():
+        while True:
+            result = await db.execute(
+                candidates_statement, {"cutoff": cutoff, "batch_size": batch_size}
+            )
+            candidates = result.tuples().all()
+            if not candidates:
+                break
+
+            # Same lock order as single updates: client rows (version) first
+            bumped = {client_id for _, client_id in candidates}
+            await bump_client_versions(db, bumped)
+            result = await db.execute(
+                move_statement,
+                {"cutoff": cutoff, "ids": [entity_id for entity_id, _ in candidates]},
+            )
+            rows = result.tuples().all()
+            if not rows:
+                # Every candidate changed meanwhile: leave them to the next run
+                await db.rollback()
+                break
+
+            batch_clients = {client_id for _, client_id in rows}
+            # A row moved to another client since the SELECT
+            await bump_client_versions(db, batch_clients - bumped)
+            await refresh_client_totals(db, batch_clients)
+            for entity_id, client_id in rows:
+                record_change(db, entity, "archived", [entity_id], client_id)
+            await db.commit()
+            for client_id in batch_clients:
+                invalidate_client(client_id)
+
+            counts[entity] += len(rows)
+            batches += 1
+            client_ids |= batch_clients
+            if len(candidates) < batch_size:
+                break
+
+    return {
+        "as_of": as_of,
+        "cutoff": cutoff,
+        "loans": counts["loan"],
+        "deposits": counts["deposit"],
+        "batches": batches,
+        "clients": len(client_ids),
+    }
+
+
+async def get_client_archive(
+    db: AsyncSession, client_id: int
+) -> Tuple[Sequence[LoanArchive], Sequence[DepositArchive]]:
+    """Archived loans and deposits of a client, latest end date first."""
+    loans = await db.execute(_ARCHIVED_LOANS, {"client_id": client_id})
+    deposits = await db.execute(_ARCHIVED_DEPOSITS, {"client_id": client_id})
+    return loans.scalars().all(), deposits.scalars().all()
@@ -1,67 +1,338 @@
+from sqlalchemy import bindparam, delete, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from typing import Optional, Sequence, Tuple
+from sqlalchemy.orm import load_only, selectinload
+from typing import Callable, Collection, Iterable, Optional, Sequence, Tuple
 
+from app.core.cache import invalidate_client
+from app.core.config import CLIENT_SEARCH_THRESHOLD
+from app.core.events import record_change
+from app.db.models.archive import DepositArchive, LoanArchive
 from app.db.models.client import Client
 from app.db.models.deposit import Deposit
 from app.db.models.loan import Loan
+from app.db.models.loan_payment import LoanBalance
 from app.schemas.client import ClientCreate, ClientUpdate
 
 
+class ClientVersionConflict(Exception):
+    """Raised when an update expects a client version that is no longer current."""
+
+    def __init__(self, client_id: int, current_version: int):
+        super().__init__(
+            f"Client {client_id} has version {current_version}, update was rejected."
+        )
+        self.client_id = client_id
+        self.current_version = current_version
+
+
+# --- Prebuilt statements ---
+# Hot queries are built once and executed with bound parameters, so a call
+# skips select() construction and cache key generation, and asyncpg reuses
+# its prepared statement (DB_PREPARED_STATEMENT_CACHE_SIZE).
+
+# Reference relations (job, education level, marital status, deposit type)
+# are never loaded: responses attach them by id from core.references.
+
+_CLIENTS_PAGE = select(Client).offset(bindparam("skip")).limit(bindparam("limit"))
+
+_CLIENT_BY_ID = select(Client).where(Client.id == bindparam("client_id"))
+
+_CLIENT_FULL_BY_ID = (
+    select(Client)
+    .options(selectinload(Client.loans), selectinload(Client.deposits))
+    .where(Client.id == bindparam("client_id"))
+)
+
+_CLIENT_VERSION = select(Client.version).where(Client.id == bindparam("client_id"))
+
+_BUMP_CLIENT_VERSION = (
+    update(Client)
+    .where(Client.id == bindparam("client_id"))
+    .values(version=Client.version + 1)
+    .execution_options(synchronize_session=False)
+)
+
+_BUMP_CLIENT_VERSIONS = (
+    update(Client)
+    .where(Client.id.in_(bindparam("client_ids", expanding=True)))
+    .values(version=Client.version + 1)
+    .execution_options(synchronize_session=False)
+)
+
+# Finance totals of a client, computed from loans/deposits/loan_balances
+# (correlated to the clients row being updated)
+_CLIENT_TOTALS = {
+    "loans_count": select(func.count(Loan.id))
+    .where(Loan.client_id == Client.id)
+    .scalar_subquery(),
+    "loans_outstanding": select(
+        func.coalesce(
+            func.sum(
+                func.greatest(
+                    Loan.amount - func.coalesce(LoanBalance.paid_total, 0.0), 0.0
+                )
+            ),
+            0.0,
+        )
+    )
+    .outerjoin(LoanBalance, LoanBalance.loan_id == Loan.id)
+    .where(Loan.client_id == Client.id)
+    .scalar_subquery(),
+    "loans_overdue_amount": select(func.coalesce(func.sum(Loan.overdue_amount), 0.0))
+    .where(Loan.client_id == Client.id, Loan.is_overdue)
+    .scalar_subquery(),
+    "deposits_count": select(func.count(Deposit.id))
+    .where(Deposit.client_id == Client.id)
+    .scalar_subquery(),
+    "deposits_balance": select(func.coalesce(func.sum(Deposit.amount), 0.0))
+    .where(Deposit.client_id == Client.id)
+    .scalar_subquery(),
+}
+
+_REFRESH_CLIENT_TOTALS = (
+    update(Client)
+    .where(Client.id.in_(bindparam("client_ids", expanding=True)))
+    .values(**_CLIENT_TOTALS)
+    .execution_options(synchronize_session=False)
+)
+
+_LOANS_COUNT = select(func.count(Loan.id)).where(
+    Loan.client_id == bindparam("client_id")
+)
+
+_DEPOSITS_COUNT = select(func.count(Deposit.id)).where(
+    Deposit.client_id == bindparam("client_id")
+)
+
+# Archived rows go with the client (ON DELETE CASCADE)
+_ARCHIVED_COUNTS = select(
+    select(func.count(LoanArchive.id))
+    .where(LoanArchive.client_id == bindparam("client_id"))
+    .scalar_subquery(),
+    select(func.count(DepositArchive.id))
+    .where(DepositArchive.client_id == bindparam("client_id"))
+    .scalar_subquery(),
+)
+
+
 async def get_clients(
     db: AsyncSession, skip: int = 0, limit: int = 100
 ) -> Sequence[Client]:
     """
-    Get list of clients.
-    Optimization: No eager loads needed if using ClientSummary schema which only uses ID/Name.
-    If we want to show Job Name in the list, we would need to join Job.
-    Assume ClientSummary is lightweight.
+    Get list of clients (columns only, the job comes from core.references).
     """
-    stmt = select(Client).options(selectinload(Client.job)).offset(skip).limit(limit)
-    result = await db.execute(stmt)
+    result = await db.execute(_CLIENTS_PAGE, {"skip": skip, "limit": limit})
     return result.scalars().all()
 
 
-async def get_client_by_id(db: AsyncSession, client_id: int) -> Optional[Client]:
+# --- Sparse fieldsets (?fields= / ?include=) ---
+
+CLIENT_FIELDS = tuple(Client.__table__.columns.keys())
+
+# include= name -> (relationship, FK column); relations with an FK column are
+# references, attached from core.references instead of being loaded
+CLIENT_RELATIONS = {
+    "job": (Client.job, Client.job_id),
+    "education_level": (Client.education_level, Client.education_level_id),
+    "marital_status": (Client.marital_status, Client.marital_status_id),
+    "loans": (Client.loans, None),
+    "deposits": (Client.deposits, None),
+    "deposits.type": (Client.deposits, None),
+}
+
+
+def _sparse_clients_query(fields: Collection[str], relations: Collection[str]):
     """
-    Get detailed client info.
-    Includes: Job, Education, MaritalStatus (Reference tables).
-    Does NOT include: Loans, Deposits (to keep query lighter).
+    Select only the requested client columns (plus FKs of requested
+    references) and eager-load only the requested loans/deposits.
     """
-    stmt = (
-        select(Client)
-        .options(
-            selectinload(Client.job),
-            selectinload(Client.education_level),
-            selectinload(Client.marital_status),
-        )
-        .where(Client.id == client_id)
+    columns = [getattr(Client, name) for name in fields]
+    # By attribute name: `in` would compare relationships as SQL expressions
+    loaded = {}
+    for name in relations:
+        relationship, fk_column = CLIENT_RELATIONS[name]
+        if fk_column is not None:
+            columns.append(fk_column)
+        else:
+            loaded[relationship.key] = relationship
+    return select(Client).options(
+        load_only(*columns),
+        *(selectinload(relationship) for relationship in loaded.values()),
+    )
+
+
+async def get_clients_sparse(
+    db: AsyncSession,
+    fields: Collection[str],
+    relations: Collection[str],
+    skip: int = 0,
+    limit: int = 100,
+) -> Sequence[Client]:
+    """
+    Get list of clients with only the given columns and relations loaded.
+    Other attributes (and the reference relations) must not be accessed on
+    the result.
+    """
+    result = await db.execute(
+        _sparse_clients_query(fields, relations)
+        .order_by(Client.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_client_sparse(
+    db: AsyncSession,
+    client_id: int,
+    fields: Collection[str],
+    relations: Collection[str],
+) -> Optional[Client]:
+    """Same as get_clients_sparse for a single client (None if not found)."""
+    result = await db.execute(
+        _sparse_clients_query(fields, relations).where(Client.id == client_id)
     )
-    result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
-async def get_client_full_by_id(db: AsyncSession, client_id: int) -> Optional[Client]:
+async def search_clients(
+    db: AsyncSession, query: str, limit: int = 20
+) -> Sequence[Tuple[Client, float]]:
+    """
+    Fuzzy search by full name, best matches first.
+
+    Uses pg_trgm word similarity: `full_name %> query` is answered by the
+    GIN trigram index, so partial names ("Иванов") and typos ("Ивонов Петр")
+    match. Returns (client, score) pairs, score in 0..1.
     """
-    Get FULL client info.
-    Includes: References AND Loans, Deposits.
-    """
-    stmt = (
-        select(Client)
-        .options(
-            selectinload(Client.job),
-            selectinload(Client.education_level),
-            selectinload(Client.marital_status),
-            selectinload(Client.loans),
-            selectinload(Client.deposits).selectinload(Deposit.type),
+    await db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.word_similarity_threshold", str(CLIENT_SEARCH_THRESHOLD), True
+            )
         )
-        .where(Client.id == client_id)
     )
-    result = await db.execute(stmt)
+    score = func.word_similarity(query, Client.full_name)
+    result = await db.execute(
+        select(Client, score.label("score"))
+        .where(Client.full_name.op("%>")(query))
+        .order_by(score.desc(), Client.full_name)
+        .limit(limit)
+    )
+    return result.tuples().all()
+
+
+async def get_client_by_id(db: AsyncSession, client_id: int) -> Optional[Client]:
+    """
+    Get detailed client info: the client row only (references are attached
+    by id, loans and deposits are not loaded).
+    """
+    result = await db.execute(_CLIENT_BY_ID, {"client_id": client_id})
+    return result.scalar_one_or_none()
+
+
+async def get_client_full_by_id(db: AsyncSession, client_id: int) -> Optional[Client]:
+    """
+    Get FULL client info: the client with loans and deposits (references,
+    deposit types included, are attached by id).
+    """
+    result = await db.execute(_CLIENT_FULL_BY_ID, {"client_id": client_id})
+    return result.scalar_one_or_none()
+
+
+async def get_client_version(db: AsyncSession, client_id: int) -> Optional[int]:
+    """
+    Get only the current version of a client (cheap check for conditional GET).
+    Returns None if client not found.
+    """
+    result = await db.execute(_CLIENT_VERSION, {"client_id": client_id})
     return result.scalar_one_or_none()
 
 
+async def bump_client_version(db: AsyncSession, client_id: int) -> None:
+    """
+    Increment client version in the current transaction.
+    Called whenever the client's loans or deposits change.
+    """
+    await db.execute(_BUMP_CLIENT_VERSION, {"client_id": client_id})
+
+
+async def bump_client_versions(db: AsyncSession, client_ids: Iterable[int]) -> None:
+    """Same as bump_client_version for many clients (one UPDATE)."""
+    client_ids = list(client_ids)
+    if client_ids:
+        await db.execute(_BUMP_CLIENT_VERSIONS, {"client_ids": client_ids})
+
+
+async def refresh_client_totals(db: AsyncSession, client_ids: Iterable[int]) -> None:
+    """
+    Recompute finance totals of clients in the current transaction.
+
+    Call after bump_client_version(s): the version UPDATE locks the client
+    rows, so this statement sees the loans/deposits of transactions that
+    committed while we waited and concurrent writers cannot lose updates.
+    """
+    client_ids = sorted(set(client_ids))
+    if client_ids:
+        # Sessions don't autoflush: write pending loan/deposit changes first
+        await db.flush()
+        await db.execute(_REFRESH_CLIENT_TOTALS, {"client_ids": client_ids})
+
+
+async def reconcile_client_totals(
+    db: AsyncSession,
+    batch_size: int,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> dict:
+    """
+    Rebuild finance totals of all clients (repairs drift after manual SQL,
+    restores and the like).
+
+    Walks clients by id in batches, each a single UPDATE committed
+    separately; only clients whose stored totals differ are written, and
+    those get a version bump so cached responses are dropped.
+    """
+    total = (await db.execute(select(func.count(Client.id)))).scalar_one()
+    stored = tuple_(*(getattr(Client, name) for name in _CLIENT_TOTALS))
+    computed = tuple_(*_CLIENT_TOTALS.values())
+
+    last_id = 0
+    checked = 0
+    fixed = 0
+    while True:
+        result = await db.execute(
+            select(Client.id)
+            .where(Client.id > last_id)
+            .order_by(Client.id)
+            .limit(batch_size)
+        )
+        batch_ids = result.scalars().all()
+        if not batch_ids:
+            break
+
+        result = await db.execute(
+            update(Client)
+            .where(Client.id.in_(batch_ids), stored.is_distinct_from(computed))
+            .values(**_CLIENT_TOTALS, version=Client.version + 1)
+            .returning(Client.id)
+            .execution_options(synchronize_session=False)
+        )
+        fixed_ids = result.scalars().all()
+        record_change(db, "client", "updated", fixed_ids)
+        await db.commit()
+        for client_id in fixed_ids:
+            invalidate_client(client_id)
+
+        last_id = batch_ids[-1]
+        checked += len(batch_ids)
+        fixed += len(fixed_ids)
+        if on_progress is not None and total:
+            on_progress(checked / total)
+
+    return {"checked": checked, "fixed": fixed}
+
+
 # --- CREATE ---
 
 
@@ -71,42 +342,50 @@ async def create_client(db: AsyncSession, client_in: ClientCreate) -> Client:
     """
     db_client = Client(**client_in.model_dump())
     db.add(db_client)
+    await db.flush()  # id for the change event
+    record_change(db, "client", "created", [db_client.id])
     await db.commit()
     await db.refresh(db_client)
-    # Re-fetch to load relations (needed for response model)
-    created_client = await get_client_by_id(db, db_client.id)
-    if not created_client:
-         return db_client # Should not happen
-    return created_client
+    return db_client
 
 
 # --- UPDATE ---
 
 
 async def update_client(
-    db: AsyncSession, client_id: int, client_in: ClientUpdate
+    db: AsyncSession,
+    client_id: int,
+    client_in: ClientUpdate,
+    expected_version: Optional[int] = None,
 ) -> Optional[Client]:
     """
-    Update an existing client.
+    Update an existing client with a single UPDATE (bumps version).
     Returns None if client not found.
-    """
-    # First, get the client
-    stmt = select(Client).where(Client.id == client_id)
-    result = await db.execute(stmt)
-    db_client = result.scalar_one_or_none()
-
-    if db_client is None:
-        return None
 
+    If expected_version is given, the update only applies while the client
+    still has that version, otherwise ClientVersionConflict is raised.
+    """
     # Update only provided fields (exclude unset)
     update_data = client_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_client, field, value)
 
+    stmt = update(Client).where(Client.id == client_id)
+    if expected_version is not None:
+        stmt = stmt.where(Client.version == expected_version)
+    stmt = stmt.values(**update_data, version=Client.version + 1).returning(Client.id)
+
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        # Nothing updated: either no such client or the version moved on
+        current_version = await get_client_version(db, client_id)
+        if current_version is None:
+            return None
+        raise ClientVersionConflict(client_id, current_version)
+
+    record_change(db, "client", "updated", [client_id])
     await db.commit()
-    await db.refresh(db_client)
+    invalidate_client(client_id)
 
-    # Re-fetch with relations for response
+    # Re-fetch for the response (server-side version, totals)
     return await get_client_by_id(db, client_id)
 
 
@@ -120,15 +399,20 @@ async def get_client_finance_counts(
     Get counts of loans and deposits for a client.
     Returns (loans_count, deposits_count).
     """
-    loans_result = await db.execute(select(Loan).where(Loan.client_id == client_id))
-    loans_count = len(loans_result.scalars().all())
+    loans_result = await db.execute(_LOANS_COUNT, {"client_id": client_id})
+    deposits_result = await db.execute(_DEPOSITS_COUNT, {"client_id": client_id})
+    return loans_result.scalar_one(), deposits_result.scalar_one()
 
-    deposits_result = await db.execute(
-        select(Deposit).where(Deposit.client_id == client_id)
-    )
-    deposits_count = len(deposits_result.scalars().all())
 
-    return loans_count, deposits_count
+async def get_client_archived_counts(
+    db: AsyncSession, client_id: int
+) -> Tuple[int, int]:
+    """
+    Get counts of archived loans and deposits for a client.
+    Returns (archived_loans_count, archived_deposits_count).
+    """
+    result = await db.execute(_ARCHIVED_COUNTS, {"client_id": client_id})
+    return tuple(result.one())
 
 
 async def delete_client(
@@ -139,10 +423,10 @@ async def delete_client(
 
     If force=False (default):
         - Returns None if client not found
-        - Raises ValueError if client has loans/deposits
+        - Raises ValueError if client has loans/deposits, archived included
 
     If force=True:
-        - Deletes client and all related loans/deposits
+        - Deletes client and all related loans/deposits, archived included
         - Returns dict with deletion stats
     """
     # Check if client exists
@@ -155,10 +439,12 @@ async def delete_client(
 
     # Get finance counts
     loans_count, deposits_count = await get_client_finance_counts(db, client_id)
+    archived_loans, archived_deposits = await get_client_archived_counts(db, client_id)
 
-    if not force and (loans_count > 0 or deposits_count > 0):
+    if not force and (loans_count or deposits_count or archived_loans or archived_deposits):
         raise ValueError(
-            f"Клиент имеет {loans_count} кредит(ов) и {deposits_count} депозит(ов). "
+            f"Клиент имеет {loans_count} кредит(ов) и {deposits_count} депозит(ов), "
+            f"в архиве {archived_loans} кредит(ов) и {archived_deposits} депозит(ов). "
             "Используйте force=true для каскадного удаления."
         )
 
@@ -183,13 +469,90 @@ async def delete_client(
             await db.delete(deposit)
             deleted_deposits += 1
 
-    # Delete client
+    # Delete client (archived loans/deposits cascade)
     await db.delete(db_client)
+    record_change(db, "client", "deleted", [client_id])
     await db.commit()
+    invalidate_client(client_id)
 
     return {
         "deleted": True,
         "client_id": client_id,
         "deleted_loans": deleted_loans,
         "deleted_deposits": deleted_deposits,
+        "deleted_archived_loans": archived_loans,
+        "deleted_archived_deposits": archived_deposits,
+    }
+
+
+async def delete_client_in_batches(
+    db: AsyncSession,
+    client_id: int,
+    batch_size: int,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Optional[dict]:
+    """
+    Force-delete a client with a large history.
+
+    Loans and deposits, then their archived copies, are removed with
+    set-based DELETEs of at most batch_size rows, each committed separately
+    to keep transactions and locks short. Returns None if client not found,
+    otherwise deletion stats (same shape as delete_client).
+    """
+    if await get_client_version(db, client_id) is None:
+        return None
+
+    loans_count, deposits_count = await get_client_finance_counts(db, client_id)
+    archived_loans, archived_deposits = await get_client_archived_counts(db, client_id)
+    total = loans_count + deposits_count + archived_loans + archived_deposits
+    entities = {
+        Loan: "loan",
+        Deposit: "deposit",
+        LoanArchive: "loan",
+        DepositArchive: "deposit",
+    }
+    deleted = dict.fromkeys(entities, 0)
+
+    for model in entities:
+        while True:
+            # Same lock order as single updates: client row (version) first
+            await bump_client_version(db, client_id)
+            batch_ids = (
+                select(model.id)
+                .where(model.client_id == client_id)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                delete(model)
+                .where(model.id.in_(batch_ids))
+                .returning(model.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted_ids = result.scalars().all()
+            if not deleted_ids:
+                await db.rollback()
+                break
+
+            await refresh_client_totals(db, [client_id])
+            record_change(db, entities[model], "deleted", deleted_ids, client_id)
+            await db.commit()
+            invalidate_client(client_id)
+
+            deleted[model] += len(deleted_ids)
+            if on_progress is not None and total:
+                on_progress(sum(deleted.values()) / total)
+
+    await db.execute(delete(Client).where(Client.id == client_id))
+    record_change(db, "client", "deleted", [client_id])
+    await db.commit()
+    invalidate_client(client_id)
+
+    return {
+        "deleted": True,
+        "client_id": client_id,
+        "deleted_loans": deleted[Loan],
+        "deleted_deposits": deleted[Deposit],
+        "deleted_archived_loans": deleted[LoanArchive],
+        "deleted_archived_deposits": deleted[DepositArchive],
     }
@@ -1,11 +1,87 @@
+from datetime import date, datetime, timezone
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    bindparam,
+    case,
+    cast,
+    exists,
+    func,
+    insert,
+    literal_column,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from typing import Sequence, Optional
-
+from sqlalchemy.orm import joinedload, selectinload
+from typing import AsyncIterator, Sequence, Optional
+
+from app.core.cache import invalidate_client
+from app.core.config import BULK_UPDATE_MAX_ROWS, DEPOSIT_MATURITIES_MAX_DAYS
+from app.core.events import record_change
+from app.crud.idempotency import (
+    IdempotentRequest,
+    check_idempotency_key,
+    remember_response,
+    store_response,
+)
+from app.crud.client import (
+    bump_client_version,
+    bump_client_versions,
+    refresh_client_totals,
+)
 from app.db.models.loan import Loan
+from app.db.models.client import Client
 from app.db.models.deposit import Deposit
-from app.schemas.finance import LoanCreate, LoanUpdate, DepositCreate, DepositUpdate
+from app.db.models.deposit_type import DepositType
+from app.db.models.loan_payment import LoanBalance, LoanPayment
+from app.schemas.finance import (
+    Loan as LoanOut,
+    Deposit as DepositOut,
+    LoanCreate,
+    LoanUpdate,
+    DepositCreate,
+    DepositUpdate,
+    LoanPaymentCreate,
+    LoanBulkUpdate,
+    DepositBulkUpdate,
+)
+
+
+# Prebuilt statements, executed with bound parameters (see crud/client.py)
+_LOAN_BY_ID = select(Loan).where(Loan.id == bindparam("loan_id"))
+_LOANS_BY_CLIENT = select(Loan).where(Loan.client_id == bindparam("client_id"))
+_DEPOSIT_BY_ID = (
+    select(Deposit)
+    .options(selectinload(Deposit.type))
+    .where(Deposit.id == bindparam("deposit_id"))
+)
+_DEPOSITS_BY_CLIENT = select(Deposit).where(Deposit.client_id == bindparam("client_id"))
+
+MATURITY_BUCKETS = ("day", "week", "month")
+
+# First day of the bucket an end_date falls into (weeks start on Monday).
+# The unit is inlined, so SELECT and GROUP BY hold the same expression.
+_MATURITY_BUCKET_START = {
+    bucket: cast(
+        func.date_trunc(literal_column(f"'{bucket}'"), cast(Deposit.end_date, DateTime)),
+        Date,
+    )
+    for bucket in MATURITY_BUCKETS
+}
+_MATURING_DEPOSITS = (
+    select(Deposit)
+    .options(joinedload(Deposit.type))
+    .where(
+        Deposit.end_date >= bindparam("from_date"),
+        Deposit.end_date <= bindparam("to_date"),
+    )
+    .order_by(Deposit.end_date, Deposit.id)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
 
 
 # ============================================================================
@@ -13,24 +89,41 @@ from app.schemas.finance import LoanCreate, LoanUpdate, DepositCreate, DepositUp
 # ============================================================================
 
 
-async def create_loan(db: AsyncSession, loan_in: LoanCreate) -> Loan:
-    """Create a new loan."""
+async def create_loan(
+    db: AsyncSession, loan_in: LoanCreate, idempotent: Optional[IdempotentRequest] = None
+) -> Loan:
+    """
+    Create a new loan.
+    With `idempotent`, raises IdempotentReplay instead when the key was
+    used before (see crud/idempotency.py).
+    """
+    if idempotent is not None:
+        await check_idempotency_key(db, idempotent)
     db_loan = Loan(**loan_in.model_dump())
     db.add(db_loan)
+    await bump_client_version(db, db_loan.client_id)
+    await refresh_client_totals(db, [db_loan.client_id])
+    record_change(db, "loan", "created", [db_loan.id], db_loan.client_id)
+    if idempotent is not None:
+        response = LoanOut.model_validate(db_loan).model_dump(mode="json")
+        await store_response(db, idempotent, 201, response)
     await db.commit()
+    invalidate_client(db_loan.client_id)
+    if idempotent is not None:
+        remember_response(idempotent, 201, response)
     await db.refresh(db_loan)
     return db_loan
 
 
 async def get_loan_by_id(db: AsyncSession, loan_id: int) -> Optional[Loan]:
     """Get a loan by ID."""
-    result = await db.execute(select(Loan).where(Loan.id == loan_id))
+    result = await db.execute(_LOAN_BY_ID, {"loan_id": loan_id})
     return result.scalar_one_or_none()
 
 
 async def get_loans_by_client(db: AsyncSession, client_id: int) -> Sequence[Loan]:
     """Get all loans for a client."""
-    result = await db.execute(select(Loan).where(Loan.client_id == client_id))
+    result = await db.execute(_LOANS_BY_CLIENT, {"client_id": client_id})
     return result.scalars().all()
 
 
@@ -49,7 +142,11 @@ async def update_loan(
     for field, value in update_data.items():
         setattr(db_loan, field, value)
 
+    await bump_client_version(db, db_loan.client_id)
+    await refresh_client_totals(db, [db_loan.client_id])
+    record_change(db, "loan", "updated", [loan_id], db_loan.client_id)
     await db.commit()
+    invalidate_client(db_loan.client_id)
     await db.refresh(db_loan)
     return db_loan
 
@@ -63,45 +160,291 @@ async def delete_loan(db: AsyncSession, loan_id: int) -> bool:
     if db_loan is None:
         return False
 
+    client_id = db_loan.client_id
     await db.delete(db_loan)
+    await bump_client_version(db, client_id)
+    await refresh_client_totals(db, [client_id])
+    record_change(db, "loan", "deleted", [loan_id], client_id)
     await db.commit()
+    invalidate_client(client_id)
     return True
 
 
+async def stream_loan_exposures(
+    db: AsyncSession, batch_size: int
+) -> AsyncIterator[Sequence[tuple]]:
+    """
+    (outstanding, interest_rate, end_date, is_overdue) of every loan with
+    unpaid principal, in batches of batch_size rows from a server-side
+    cursor, so the whole table is never held as ORM objects.
+    """
+    outstanding = Loan.amount - func.coalesce(LoanBalance.paid_total, 0.0)
+    result = await db.stream(
+        select(outstanding, Loan.interest_rate, Loan.end_date, Loan.is_overdue)
+        .outerjoin(LoanBalance, LoanBalance.loan_id == Loan.id)
+        .where(outstanding > 0)
+        .execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield [tuple(row) for row in rows]
+
+
+async def sweep_overdue_loans(db: AsyncSession, as_of: date, batch_size: int) -> dict:
+    """
+    Flag loans that ended before `as_of`, are not fully paid and are not
+    marked overdue yet.
+
+    Works in set-based UPDATEs of at most batch_size rows, each committed
+    separately to keep lock time short. overdue_amount defaults to the unpaid
+    principal (from loan_balances) when the caller never set it.
+    """
+    paid_total = (
+        select(LoanBalance.paid_total)
+        .where(LoanBalance.loan_id == Loan.id)
+        .scalar_subquery()
+    )
+    overdue = (
+        ~Loan.is_overdue,
+        Loan.end_date < as_of,
+        ~exists().where(
+            LoanBalance.loan_id == Loan.id,
+            LoanBalance.paid_total >= Loan.amount,
+        ),
+    )
+    updated = 0
+    batches = 0
+    client_ids: set[int] = set()
+
+    while True:
+        result = await db.execute(
+            select(Loan.id, Loan.client_id).where(*overdue).limit(batch_size)
+        )
+        candidates = result.tuples().all()
+        if not candidates:
+            break
+
+        # Same lock order as single updates: client rows (version) first
+        bumped = {client_id for _, client_id in candidates}
+        await bump_client_versions(db, bumped)
+        # Conditions again: a candidate may have been paid off meanwhile
+        result = await db.execute(
+            update(Loan)
+            .where(Loan.id.in_([loan_id for loan_id, _ in candidates]), *overdue)
+            .values(
+                is_overdue=True,
+                overdue_amount=case(
+                    (Loan.overdue_amount > 0, Loan.overdue_amount),
+                    else_=Loan.amount - func.coalesce(paid_total, 0.0),
+                ),
+            )
+            .returning(Loan.id, Loan.client_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.tuples().all()  # (id, client_id) of every updated loan
+        if not rows:
+            await db.rollback()
+            continue
+
+        batch_clients = {client_id for _, client_id in rows}
+        # A loan moved to another client since the SELECT
+        await bump_client_versions(db, batch_clients - bumped)
+        await refresh_client_totals(db, batch_clients)
+        for loan_id, client_id in rows:
+            record_change(db, "loan", "updated", [loan_id], client_id)
+        await db.commit()
+        for client_id in batch_clients:
+            invalidate_client(client_id)
+
+        updated += len(rows)
+        batches += 1
+        client_ids |= batch_clients
+
+    return {
+        "as_of": as_of,
+        "updated": updated,
+        "batches": batches,
+        "clients": len(client_ids),
+    }
+
+
+# ============================================================================
+# LOAN PAYMENTS
+# ============================================================================
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive timestamps are taken as UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+async def append_loan_payments(
+    db: AsyncSession, payments: Sequence[LoanPaymentCreate]
+) -> dict:
+    """
+    Append a batch of payments to the ledger.
+
+    One multi-row INSERT for the payments and one upsert that adds the batch
+    totals to loan_balances, in the same transaction (which also refreshes
+    the outstanding totals of the clients involved).
+    Raises ValueError if any loan does not exist.
+    """
+    loan_ids = {p.loan_id for p in payments}
+    result = await db.execute(
+        select(Loan.id, Loan.client_id).where(Loan.id.in_(list(loan_ids)))
+    )
+    owners = dict(result.tuples().all())
+    missing = loan_ids - owners.keys()
+    if missing:
+        raise ValueError(f"Кредиты не найдены: {sorted(missing)}")
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "loan_id": p.loan_id,
+            "client_id": owners[p.loan_id],
+            "amount": p.amount,
+            "paid_at": _as_utc(p.paid_at) if p.paid_at else now,
+        }
+        for p in payments
+    ]
+    await db.execute(insert(LoanPayment), rows)
+
+    totals: dict[int, dict] = {}
+    for row in rows:
+        total = totals.setdefault(
+            row["loan_id"],
+            {
+                "loan_id": row["loan_id"],
+                "client_id": row["client_id"],
+                "paid_total": 0.0,
+                "payments_count": 0,
+                "last_payment_at": row["paid_at"],
+            },
+        )
+        total["paid_total"] += row["amount"]
+        total["payments_count"] += 1
+        total["last_payment_at"] = max(total["last_payment_at"], row["paid_at"])
+
+    # Sorted by loan_id so concurrent batches lock balance rows in the same order
+    stmt = pg_insert(LoanBalance).values([totals[k] for k in sorted(totals)])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[LoanBalance.loan_id],
+            set_={
+                "paid_total": LoanBalance.paid_total + stmt.excluded.paid_total,
+                "payments_count": LoanBalance.payments_count
+                + stmt.excluded.payments_count,
+                "last_payment_at": func.greatest(
+                    LoanBalance.last_payment_at, stmt.excluded.last_payment_at
+                ),
+            },
+        )
+    )
+    client_ids = {row["client_id"] for row in rows}
+    await bump_client_versions(db, client_ids)
+    await refresh_client_totals(db, client_ids)
+    for loan_id in sorted(totals):
+        record_change(db, "loan", "updated", [loan_id], totals[loan_id]["client_id"])
+    await db.commit()
+    for client_id in client_ids:
+        invalidate_client(client_id)
+
+    return {"inserted": len(rows), "loans": len(totals)}
+
+
+async def get_loan_balance(db: AsyncSession, loan_id: int) -> Optional[dict]:
+    """
+    Get the balance of a loan from its running total.
+    Returns None if loan not found.
+    """
+    paid_total = func.coalesce(LoanBalance.paid_total, 0.0)
+    result = await db.execute(
+        select(
+            Loan.id.label("loan_id"),
+            Loan.client_id,
+            Loan.amount,
+            paid_total.label("paid_total"),
+            func.greatest(Loan.amount - paid_total, 0.0).label("outstanding"),
+            func.coalesce(LoanBalance.payments_count, 0).label("payments_count"),
+            LoanBalance.last_payment_at,
+        )
+        .outerjoin(LoanBalance, LoanBalance.loan_id == Loan.id)
+        .where(Loan.id == loan_id)
+    )
+    row = result.mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+async def get_client_balance(db: AsyncSession, client_id: int) -> Optional[dict]:
+    """
+    Get totals over all loans of a client from the running totals.
+    Returns None if client not found.
+    """
+    paid_total = func.coalesce(LoanBalance.paid_total, 0.0)
+    result = await db.execute(
+        select(
+            Client.id.label("client_id"),
+            func.count(Loan.id).label("loans_count"),
+            func.coalesce(func.sum(Loan.amount), 0.0).label("amount_total"),
+            func.coalesce(func.sum(paid_total), 0.0).label("paid_total"),
+            func.coalesce(
+                func.sum(func.greatest(Loan.amount - paid_total, 0.0)), 0.0
+            ).label("outstanding"),
+        )
+        .outerjoin(Loan, Loan.client_id == Client.id)
+        .outerjoin(LoanBalance, LoanBalance.loan_id == Loan.id)
+        .where(Client.id == client_id)
+        .group_by(Client.id)
+    )
+    row = result.mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
 # ============================================================================
 # DEPOSITS
 # ============================================================================
 
 
-async def create_deposit(db: AsyncSession, deposit_in: DepositCreate) -> Deposit:
-    """Create a new deposit."""
+async def create_deposit(
+    db: AsyncSession,
+    deposit_in: DepositCreate,
+    idempotent: Optional[IdempotentRequest] = None,
+) -> Deposit:
+    """
+    Create a new deposit.
+    With `idempotent`, raises IdempotentReplay instead when the key was
+    used before (see crud/idempotency.py).
+    """
+    if idempotent is not None:
+        await check_idempotency_key(db, idempotent)
     db_deposit = Deposit(**deposit_in.model_dump())
     db.add(db_deposit)
+    await bump_client_version(db, db_deposit.client_id)
+    await refresh_client_totals(db, [db_deposit.client_id])
+    record_change(db, "deposit", "created", [db_deposit.id], db_deposit.client_id)
+    # Re-fetch with eager load of type relationship (before the commit, so
+    # the stored idempotent response has it too)
+    result = await db.execute(_DEPOSIT_BY_ID, {"deposit_id": db_deposit.id})
+    db_deposit = result.scalar_one()
+    if idempotent is not None:
+        response = DepositOut.model_validate(db_deposit).model_dump(mode="json")
+        await store_response(db, idempotent, 201, response)
     await db.commit()
-    # Re-fetch with eager load of type relationship
-    stmt = (
-        select(Deposit)
-        .options(selectinload(Deposit.type))
-        .where(Deposit.id == db_deposit.id)
-    )
-    result = await db.execute(stmt)
-    return result.scalar_one()
+    invalidate_client(db_deposit.client_id)
+    if idempotent is not None:
+        remember_response(idempotent, 201, response)
+    return db_deposit
 
 
 async def get_deposit_by_id(db: AsyncSession, deposit_id: int) -> Optional[Deposit]:
     """Get a deposit by ID with type relationship loaded."""
-    stmt = (
-        select(Deposit)
-        .options(selectinload(Deposit.type))
-        .where(Deposit.id == deposit_id)
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_DEPOSIT_BY_ID, {"deposit_id": deposit_id})
     return result.scalar_one_or_none()
 
 
 async def get_deposits_by_client(db: AsyncSession, client_id: int) -> Sequence[Deposit]:
     """Get all deposits for a client."""
-    result = await db.execute(select(Deposit).where(Deposit.client_id == client_id))
+    result = await db.execute(_DEPOSITS_BY_CLIENT, {"client_id": client_id})
     return result.scalars().all()
 
 
@@ -120,7 +463,11 @@ async def update_deposit(
     for field, value in update_data.items():
         setattr(db_deposit, field, value)
 
+    await bump_client_version(db, db_deposit.client_id)
+    await refresh_client_totals(db, [db_deposit.client_id])
+    record_change(db, "deposit", "updated", [deposit_id], db_deposit.client_id)
     await db.commit()
+    invalidate_client(db_deposit.client_id)
 
     # Re-fetch with type relationship
     return await get_deposit_by_id(db, deposit_id)
@@ -135,6 +482,189 @@ async def delete_deposit(db: AsyncSession, deposit_id: int) -> bool:
     if db_deposit is None:
         return False
 
+    client_id = db_deposit.client_id
     await db.delete(db_deposit)
+    await bump_client_version(db, client_id)
+    await refresh_client_totals(db, [client_id])
+    record_change(db, "deposit", "deleted", [deposit_id], client_id)
     await db.commit()
+    invalidate_client(client_id)
     return True
+
+
+def _check_maturity_range(from_date: date, to_date: date) -> None:
+    if to_date < from_date:
+        raise ValueError("Дата окончания периода раньше даты начала")
+    if (to_date - from_date).days >= DEPOSIT_MATURITIES_MAX_DAYS:
+        raise ValueError(
+            f"Период не может быть длиннее {DEPOSIT_MATURITIES_MAX_DAYS} дней"
+        )
+
+
+async def get_deposit_maturities(
+    db: AsyncSession, from_date: date, to_date: date, bucket: str
+) -> dict:
+    """
+    final_amount of deposits ending in [from_date, to_date], summed per
+    bucket (day, week or month of end_date) and deposit type.
+
+    One GROUP BY over ix_deposits_end_date (which includes type_id and
+    final_amount); only the grouped rows leave the database.
+    Raises ValueError for an empty or too long range.
+    """
+    _check_maturity_range(from_date, to_date)
+    bucket_start = _MATURITY_BUCKET_START[bucket]
+    result = await db.execute(
+        select(
+            bucket_start.label("start"),
+            Deposit.type_id,
+            DepositType.name.label("type_name"),
+            func.count().label("deposits_count"),
+            func.sum(Deposit.final_amount).label("final_amount"),
+        )
+        .join(DepositType, DepositType.id == Deposit.type_id)
+        .where(Deposit.end_date >= from_date, Deposit.end_date <= to_date)
+        .group_by(bucket_start, Deposit.type_id, DepositType.name)
+        .order_by(bucket_start, Deposit.type_id)
+    )
+
+    buckets: dict[date, dict] = {}
+    for row in result.mappings():
+        entry = buckets.setdefault(
+            row["start"],
+            {"start": row["start"], "deposits_count": 0, "final_amount": 0.0, "types": []},
+        )
+        entry["deposits_count"] += row["deposits_count"]
+        entry["final_amount"] += row["final_amount"]
+        entry["types"].append(
+            {
+                "type_id": row["type_id"],
+                "type_name": row["type_name"],
+                "deposits_count": row["deposits_count"],
+                "final_amount": row["final_amount"],
+            }
+        )
+
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "bucket": bucket,
+        "deposits_count": sum(b["deposits_count"] for b in buckets.values()),
+        "final_amount": sum(b["final_amount"] for b in buckets.values()),
+        "buckets": list(buckets.values()),
+    }
+
+
+async def get_maturing_deposits(
+    db: AsyncSession, from_date: date, to_date: date, skip: int = 0, limit: int = 100
+) -> Sequence[Deposit]:
+    """
+    Deposits ending in [from_date, to_date], by end_date then id, with
+    their type. Raises ValueError for an empty or too long range.
+    """
+    _check_maturity_range(from_date, to_date)
+    result = await db.execute(
+        _MATURING_DEPOSITS,
+        {"from_date": from_date, "to_date": to_date, "skip": skip, "limit": limit},
+    )
+    return result.scalars().all()
+
+
+# ============================================================================
+# BULK UPDATES
+# ============================================================================
+
+
+def _bulk_conditions(model, filter_in) -> list:
+    """WHERE clauses of a LoanFilter / DepositFilter (unset fields are ignored)."""
+    conditions = []
+    if filter_in.client_ids is not None:
+        conditions.append(model.client_id.in_(filter_in.client_ids))
+    if filter_in.job_id is not None:
+        conditions.append(
+            model.client_id.in_(select(Client.id).where(Client.job_id == filter_in.job_id))
+        )
+    if getattr(filter_in, "is_overdue", None) is not None:
+        conditions.append(model.is_overdue == filter_in.is_overdue)
+    if getattr(filter_in, "type_id", None) is not None:
+        conditions.append(model.type_id == filter_in.type_id)
+    if filter_in.end_date_from is not None:
+        conditions.append(model.end_date >= filter_in.end_date_from)
+    if filter_in.end_date_to is not None:
+        conditions.append(model.end_date <= filter_in.end_date_to)
+    return conditions
+
+
+async def _bulk_update(
+    db: AsyncSession, model, entity: str, filter_in, changes_in, dry_run: bool
+) -> dict:
+    conditions = _bulk_conditions(model, filter_in)
+    if not conditions:
+        raise ValueError("Укажите хотя бы одно условие фильтра")
+    changes = changes_in.model_dump(exclude_none=True)
+    if not changes:
+        raise ValueError("Не указано ни одного изменяемого поля")
+
+    if dry_run:
+        matched = await db.scalar(select(func.count()).select_from(model).where(*conditions))
+        return {"dry_run": True, "matched": matched, "ids": []}
+
+    # Reject an oversized filter before locking or writing anything
+    over_limit = select(model.id).where(*conditions).limit(BULK_UPDATE_MAX_ROWS + 1)
+    matched = await db.scalar(select(func.count()).select_from(over_limit.subquery()))
+    if matched > BULK_UPDATE_MAX_ROWS:
+        raise ValueError(
+            f"Фильтр затрагивает больше {BULK_UPDATE_MAX_ROWS} строк; уточните фильтр"
+        )
+
+    # Same lock order as single updates: client rows (version) first
+    result = await db.execute(
+        update(Client)
+        .where(Client.id.in_(select(model.client_id).where(*conditions)))
+        .values(version=Client.version + 1)
+        .returning(Client.id)
+        .execution_options(synchronize_session=False)
+    )
+    bumped = set(result.scalars().all())
+    result = await db.execute(
+        update(model)
+        .where(*conditions)
+        .values(**changes)
+        .returning(model.id, model.client_id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.tuples().all()
+    # Rows that started matching after the count
+    if len(rows) > BULK_UPDATE_MAX_ROWS:
+        await db.rollback()
+        raise ValueError(
+            f"Фильтр затрагивает {len(rows)} строк, допустимо не больше "
+            f"{BULK_UPDATE_MAX_ROWS}; уточните фильтр"
+        )
+
+    client_ids = {client_id for _, client_id in rows}
+    # Rows that started matching between the two statements
+    await bump_client_versions(db, client_ids - bumped)
+    await refresh_client_totals(db, client_ids)
+    for entity_id, client_id in rows:
+        record_change(db, entity, "updated", [entity_id], client_id)
+    await db.commit()
+    for client_id in client_ids:
+        invalidate_client(client_id)
+    return {"dry_run": False, "matched": len(rows), "ids": sorted(i for i, _ in rows)}
+
+
+async def bulk_update_loans(db: AsyncSession, bulk: LoanBulkUpdate, dry_run: bool) -> dict:
+    """
+    Apply `bulk.changes` to every loan matching `bulk.filter` in one UPDATE
+    (dry run: only count them). Raises ValueError for an empty filter or
+    change set, or when more than BULK_UPDATE_MAX_ROWS loans match.
+    """
+    return await _bulk_update(db, Loan, "loan", bulk.filter, bulk.changes, dry_run)
+
+
+async def bulk_update_deposits(
+    db: AsyncSession, bulk: DepositBulkUpdate, dry_run: bool
+) -> dict:
+    """Same as bulk_update_loans for deposits."""
+    return await _bulk_update(db, Deposit, "deposit", bulk.filter, bulk.changes, dry_run)
@@ -0,0 +1,168 @@
+"""
+Idempotency keys of create requests.
+
+A create route called with an Idempotency-Key header first looks the key up
+(in-process cache, then one SELECT); a stored response is replayed as is.
+Otherwise the route does its work and stores its response in the same
+transaction, right before the commit, with INSERT ... ON CONFLICT DO NOTHING.
+When two requests with the same key run at once, the second INSERT waits for
+the first transaction: if it commits, the second one rolls back and replays
+the stored response, so only one record is ever created.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import bindparam, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import idempotency_cache
+from app.db.models.idempotency_key import IdempotencyKey
+
+
+@dataclass(frozen=True)
+class IdempotentRequest:
+    """A create request sent with an Idempotency-Key header."""
+
+    scope: str
+    key: str
+    request_hash: str
+
+    @classmethod
+    def of(cls, scope: str, key: str, payload: BaseModel) -> "IdempotentRequest":
+        body = payload.model_dump_json().encode()
+        return cls(scope, key, hashlib.sha256(body).hexdigest())
+
+
+class IdempotentReplay(Exception):
+    """The key was used before: answer with the stored response."""
+
+    def __init__(self, status_code: int, body: dict):
+        super().__init__(f"Replaying stored response ({status_code})")
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyKeyConflict(Exception):
+    """A concurrent request stored a response for the key, which is gone now."""
+
+    def __init__(self, key: str):
+        super().__init__(
+            f"Idempotency-Key {key!r} was used by a concurrent request; retry the request"
+        )
+        self.key = key
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was used before for a different request body."""
+
+    def __init__(self, key: str):
+        super().__init__(
+            f"Idempotency-Key {key!r} was already used with a different request"
+        )
+        self.key = key
+
+
+_STORED = select(
+    IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response
+).where(
+    IdempotencyKey.scope == bindparam("scope"),
+    IdempotencyKey.key == bindparam("key"),
+)
+
+
+async def _stored(db: AsyncSession, request: IdempotentRequest) -> Optional[tuple]:
+    cache_key = (request.scope, request.key)
+    stored = idempotency_cache.get(cache_key)
+    if stored is None:
+        result = await db.execute(_STORED, {"scope": request.scope, "key": request.key})
+        row = result.one_or_none()
+        if row is None:
+            return None
+        stored = tuple(row)
+        idempotency_cache.set(cache_key, stored)
+    return stored
+
+
+def _replay(request: IdempotentRequest, stored: tuple) -> IdempotentReplay:
+    request_hash, status_code, body = stored
+    if request_hash != request.request_hash:
+        raise IdempotencyKeyReused(request.key)
+    return IdempotentReplay(status_code, body)
+
+
+async def check_idempotency_key(db: AsyncSession, request: IdempotentRequest) -> None:
+    """
+    Call before doing the work. Raises IdempotentReplay when the key already
+    has a response, IdempotencyKeyReused when that was for another body.
+    """
+    stored = await _stored(db, request)
+    if stored is not None:
+        raise _replay(request, stored)
+
+
+async def store_response(
+    db: AsyncSession, request: IdempotentRequest, status_code: int, body: dict
+) -> None:
+    """
+    Store the response in the current transaction; call right before the
+    commit. If a concurrent request with the same key committed first, rolls
+    back and raises IdempotentReplay (or IdempotencyKeyReused), or
+    IdempotencyKeyConflict when its stored response was purged meanwhile.
+    """
+    result = await db.execute(
+        pg_insert(IdempotencyKey)
+        .values(
+            scope=request.scope,
+            key=request.key,
+            request_hash=request.request_hash,
+            status_code=status_code,
+            response=body,
+        )
+        .on_conflict_do_nothing()
+        .returning(IdempotencyKey.key)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        stored = await _stored(db, request)
+        if stored is None:
+            raise IdempotencyKeyConflict(request.key)
+        raise _replay(request, stored)
+
+
+def remember_response(request: IdempotentRequest, status_code: int, body: dict) -> None:
+    """After the commit: retries reaching this worker skip the lookup."""
+    idempotency_cache.set(
+        (request.scope, request.key), (request.request_hash, status_code, body)
+    )
+
+
+async def purge_idempotency_keys(
+    db: AsyncSession, ttl_seconds: float, batch_size: int
+) -> int:
+    """
+    Delete keys older than ttl_seconds in batches of batch_size, each
+    committed separately. Returns the number of keys deleted.
+    """
+    older_than = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    deleted = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.scope, IdempotencyKey.key)
+            .where(IdempotencyKey.created_at < older_than)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,12 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def ensure_future_partitions(db: AsyncSession, months_ahead: int) -> int:
+    """
+    Create monthly partitions of loans/deposits up to `months_ahead` months
+    from now (SQL function from the partitioning migration).
+    Returns the number of partitions created.
+    """
+    result = await db.execute(select(func.ensure_future_partitions(months_ahead)))
+    return result.scalar_one()
@@ -1,10 +1,32 @@
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+
+from app.core.config import (
+    DB_BACKGROUND_STATEMENT_TIMEOUT_MS,
+    DB_ECHO,
+    DB_MAX_CONNECTIONS,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_PREPARED_STATEMENT_CACHE_SIZE,
+    DB_RESERVED_CONNECTIONS,
+    DB_STATEMENT_TIMEOUT_MS,
+    WEB_CONCURRENCY,
+)
+from app.core import query_budget
+from app.core.slow_queries import slow_query_log
+from app.core.timeouts import request_statement_timeout
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -19,14 +41,108 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Connections a worker holds outside its pool: the LISTEN connection of the
+# change feed (core.events). Scheduled tasks and jobs use pool connections;
+# stress test processes don't connect.
+EXTRA_CONNECTIONS_PER_WORKER = 1
+
+
+def pool_limits(
+    workers: int,
+    max_connections: int,
+    reserved: int,
+    pool_size: int,
+    max_overflow: int,
+    extra_per_worker: int = EXTRA_CONNECTIONS_PER_WORKER,
+) -> tuple[int, int]:
+    """
+    Cap the desired pool sizes of one worker so that all workers together
+    stay within the server budget:
+    workers * (pool_size + max_overflow + extra_per_worker)
+        <= max_connections - reserved.
+
+    Raises ValueError when not even a pool of one connection fits.
+    """
+    workers = max(1, workers)
+    per_worker = (max_connections - reserved) // workers - extra_per_worker
+    if per_worker < 1:
+        raise ValueError(
+            f"{workers} worker(s) need at least {workers * (1 + extra_per_worker)} "
+            f"connections, but DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS is "
+            f"{max_connections - reserved}. Lower WEB_CONCURRENCY or raise the budget."
+        )
+    pool_size = max(1, min(pool_size, per_worker))
+    return pool_size, max(0, min(max_overflow, per_worker - pool_size))
+
+
+POOL_SIZE, MAX_OVERFLOW = pool_limits(
+    WEB_CONCURRENCY,
+    DB_MAX_CONNECTIONS,
+    DB_RESERVED_CONNECTIONS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+)
+
+engine = create_async_engine(
+    make_url(DATABASE_URL).update_query_dict(
+        {"prepared_statement_cache_size": str(DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    ),
+    echo=DB_ECHO,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    connect_args={
+        "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    },
+)
+slow_query_log.install(engine.sync_engine)
+query_budget.install(engine.sync_engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
 
+# Sessions of background jobs, scheduled tasks and seeding (own statement_timeout)
+BackgroundSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    info={"statement_timeout_ms": DB_BACKGROUND_STATEMENT_TIMEOUT_MS},
+)
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    """
+    Set statement_timeout for the transaction when the session (background
+    work) or the current request (route budget) wants something other than
+    the connection default. SET LOCAL semantics: reset at commit/rollback.
+    """
+    timeout = session.info.get("statement_timeout_ms", request_statement_timeout.get())
+    if timeout is not None and timeout != DB_STATEMENT_TIMEOUT_MS:
+        connection.execute(
+            select(func.set_config("statement_timeout", str(timeout), True))
+        )
+
+
+async def warm_up_pool(size: int = POOL_SIZE) -> None:
+    """
+    Open `size` pool connections at once and return them to the pool,
+    so the first requests of a fresh worker don't pay for connecting.
+    """
+    connections = await asyncio.gather(
+        *(engine.connect().start() for _ in range(size))
+    )
+    await asyncio.gather(*(connection.close() for connection in connections))
+    logger.info("Connection pool warmed up with %d connections", size)
+
 
 async def get_db():
+    """
+    Request session; its transactions run with the statement_timeout
+    budget of the route (see core.timeouts).
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -5,3 +5,8 @@ from .deposit_type import DepositType
 from .job import Job
 from .education import EducationLevel
 from .marital_status import MaritalStatus
+from .background_job import BackgroundJobRecord
+from .loan_payment import LoanPayment, LoanBalance
+from .idempotency_key import IdempotencyKey
+from .archive import LoanArchive, DepositArchive
+from .scheduled_task import ScheduledTask
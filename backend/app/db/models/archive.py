@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class LoanArchive(Base):
+    """
+    Fully paid loans moved out of `loans` some time after their end date
+    (crud.archive.archive_matured). Same columns plus archived_at; payments
+    and balances of the loan stay in the ledger tables.
+    """
+
+    __tablename__ = "loans_archive"
+
+    # Ids come from the loans sequence, so they stay unique
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    client_id: Mapped[int] = mapped_column(
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    amount: Mapped[float] = mapped_column(nullable=False)
+    interest_rate: Mapped[float] = mapped_column(nullable=False)
+    is_overdue: Mapped[bool] = mapped_column(nullable=False)
+    overdue_amount: Mapped[float] = mapped_column(nullable=False)
+
+    start_date: Mapped[date] = mapped_column(nullable=False)
+    end_date: Mapped[date] = mapped_column(nullable=False)
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class DepositArchive(Base):
+    """Matured deposits moved out of `deposits` (see LoanArchive)."""
+
+    __tablename__ = "deposits_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    client_id: Mapped[int] = mapped_column(
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    type_id: Mapped[int] = mapped_column(
+        ForeignKey("deposit_types.id"),
+        nullable=False,
+    )
+
+    amount: Mapped[float] = mapped_column(nullable=False)
+    interest_rate: Mapped[float] = mapped_column(nullable=False)
+
+    start_date: Mapped[date] = mapped_column(nullable=False)
+    end_date: Mapped[date] = mapped_column(nullable=False)
+
+    final_amount: Mapped[float] = mapped_column(nullable=False)
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
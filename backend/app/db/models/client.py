@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.database import Base
@@ -6,6 +6,15 @@ from app.db.database import Base
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Fuzzy name search (pg_trgm), see crud.client.search_clients
+        Index(
+            "ix_clients_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     full_name: Mapped[str] = mapped_column(String(256), nullable=False)
@@ -18,6 +27,26 @@ class Client(Base):
     marital_status_id: Mapped[int | None] = mapped_column(
         ForeignKey("marital_statuses.id")
     )
+    # Bumped on every change of the client or its loans/deposits (used as ETag).
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
+
+    # Finance totals for list views, kept in step with loans/deposits/payments
+    # (crud.client.refresh_client_totals) and rebuilt by reconcile_client_totals.
+    loans_count: Mapped[int] = mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
+    loans_outstanding: Mapped[float] = mapped_column(
+        nullable=False, default=0.0, server_default="0"
+    )
+    loans_overdue_amount: Mapped[float] = mapped_column(
+        nullable=False, default=0.0, server_default="0"
+    )
+    deposits_count: Mapped[int] = mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
+    deposits_balance: Mapped[float] = mapped_column(
+        nullable=False, default=0.0, server_default="0"
+    )
 
     loans: Mapped[list["Loan"]] = relationship(back_populates="client")
     deposits: Mapped[list["Deposit"]] = relationship(back_populates="client")
@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.database import Base
@@ -7,6 +7,15 @@ from app.db.database import Base
 
 class Deposit(Base):
     __tablename__ = "deposits"
+    __table_args__ = (
+        # Maturity calendar (crud.finance.get_deposit_maturities): covers the
+        # aggregated columns, so buckets are summed from the index alone
+        Index(
+            "ix_deposits_end_date",
+            "end_date",
+            postgresql_include=["type_id", "final_amount"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
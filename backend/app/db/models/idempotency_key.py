@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response of a create request sent with an Idempotency-Key header, so a
+    retry with the same key gets it back instead of creating a duplicate.
+    Rows older than IDEMPOTENCY_TTL_SECONDS are purged by the scheduler.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # Route the key was used on ("POST /finance/loans"), keys are per route
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of the request body: a reused key with another body is rejected
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    response: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
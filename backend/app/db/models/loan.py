@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 from datetime import date
 
@@ -7,6 +7,14 @@ from app.db.database import Base
 
 class Loan(Base):
     __tablename__ = "loans"
+    __table_args__ = (
+        # Candidates of the overdue sweep (crud.finance.sweep_overdue_loans)
+        Index(
+            "ix_loans_end_date_not_overdue",
+            "end_date",
+            postgresql_where=text("NOT is_overdue"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
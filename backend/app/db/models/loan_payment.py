@@ -0,0 +1,53 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class LoanPayment(Base):
+    """
+    Append-only ledger of payments against loans.
+
+    loan_id has no foreign key: loans is partitioned and its primary key is
+    (id, start_date), so loans.id alone cannot be referenced.
+    """
+
+    __tablename__ = "loan_payments"
+    __table_args__ = (
+        # Rows are appended in paid_at order, a BRIN index stays tiny
+        Index("ix_loan_payments_paid_at_brin", "paid_at", postgresql_using="brin"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    loan_id: Mapped[int] = mapped_column(nullable=False)
+    client_id: Mapped[int] = mapped_column(
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    amount: Mapped[float] = mapped_column(nullable=False)
+    paid_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class LoanBalance(Base):
+    """
+    Running total of loan_payments per loan, updated with every appended
+    batch, so balances never need to sum the whole ledger.
+    """
+
+    __tablename__ = "loan_balances"
+
+    loan_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    client_id: Mapped[int] = mapped_column(
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    paid_total: Mapped[float] = mapped_column(nullable=False, default=0.0)
+    payments_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_payment_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class ScheduledTask(Base):
+    """
+    Last successful run of a periodic task (core.scheduler), shared by all
+    worker processes so a task runs once per interval, not once per worker.
+    """
+
+    __tablename__ = "scheduled_tasks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Start of the run (database clock)
+    last_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,148 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import background, timeouts
+from app.core.admission import admission
+from app.core.background import job_runner
+from app.core.cache import client_detail_cache, client_full_cache, idempotency_cache
+from app.core.events import change_feed
+from app.core.query_budget import query_budget
+from app.core.references import reference_registry
+from app.core.scheduler import scheduler
+from app.core.slow_queries import slow_query_log
+from app.core.singleflight import client_flights
+from app.core.config import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    OVERDUE_SWEEP_BATCH_SIZE,
+    RECONCILE_TOTALS_BATCH_SIZE,
+)
+from app.crud import archive as crud_archive
+from app.crud import client as crud_client
+from app.crud import finance as crud_finance
+from app.db.database import MAX_OVERFLOW, POOL_SIZE, BackgroundSessionLocal, engine, get_db
+from app.schemas.background import BackgroundJob
+from app.schemas.finance import OverdueSweepResult
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/metrics")
+@query_budget(0)
+async def read_metrics():
+    """
+    Runtime counters of the worker process that served the request.
+    """
+    return {
+        "cache": {
+            "client_detail": client_detail_cache.stats(),
+            "client_full": client_full_cache.stats(),
+            "idempotency": idempotency_cache.stats(),
+        },
+        "references": reference_registry.stats(),
+        "singleflight": client_flights.stats(),
+        "pool": {
+            "size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "status": engine.pool.status(),
+        },
+        "admission": admission.stats(),
+        "timeouts": timeouts.counters,
+        "slow_queries": slow_query_log.stats(),
+        "events": change_feed.stats(),
+        "jobs": job_runner.stats(),
+        "scheduler": scheduler.stats(),
+    }
+
+
+@router.get("/slow-queries")
+@query_budget(0)
+async def read_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    reset: bool = False,
+):
+    """
+    Slowest statements of this worker process by total time, with the route
+    that issued them and a sampled EXPLAIN (ANALYZE, BUFFERS) plan.
+    **reset** clears the log after reading it.
+    """
+    result = {**slow_query_log.stats(), "top": slow_query_log.top(limit)}
+    if reset:
+        slow_query_log.clear()
+    return result
+
+
+@router.post("/overdue-sweep", response_model=OverdueSweepResult)
+@query_budget(None)  # batches, grows with the number of overdue loans
+async def run_overdue_sweep(
+    as_of: Optional[date] = None,
+    batch_size: int = Query(OVERDUE_SWEEP_BATCH_SIZE, ge=1, le=100_000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Flag loans that ended before **as_of** (default: today) as overdue now,
+    instead of waiting for the scheduled sweep.
+    """
+    return await crud_finance.sweep_overdue_loans(
+        db, as_of or date.today(), batch_size
+    )
+
+
+@router.post(
+    "/reconcile-totals",
+    response_model=BackgroundJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@query_budget(3)  # set_config + job record
+async def reconcile_client_totals(
+    batch_size: int = Query(RECONCILE_TOTALS_BATCH_SIZE, ge=1, le=100_000),
+):
+    """
+    Rebuild the finance totals stored on all clients from loans, deposits
+    and payments in the background; poll **GET /jobs/{job_id}**.
+    The job result holds the number of clients checked and fixed.
+    """
+
+    async def run(job: background.BackgroundJob) -> dict:
+        async with BackgroundSessionLocal() as job_db:
+            return await crud_client.reconcile_client_totals(
+                job_db, batch_size, on_progress=job.report
+            )
+
+    try:
+        return await job_runner.submit("client_totals_reconcile", run)
+    except background.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+@router.post(
+    "/archive",
+    response_model=BackgroundJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@query_budget(3)  # set_config + job record
+async def archive_matured(
+    as_of: Optional[date] = None,
+    after_days: int = Query(ARCHIVE_AFTER_DAYS, ge=0),
+    batch_size: int = Query(ARCHIVE_BATCH_SIZE, ge=1, le=100_000),
+):
+    """
+    Move fully paid loans and deposits that ended more than **after_days**
+    days before **as_of** (default: today) to the archive tables in the
+    background, instead of waiting for the scheduled run; poll
+    **GET /jobs/{job_id}**.
+    """
+
+    async def run(job: background.BackgroundJob) -> dict:
+        async with BackgroundSessionLocal() as job_db:
+            return await crud_archive.archive_matured(
+                job_db, as_of or date.today(), after_days, batch_size
+            )
+
+    try:
+        return await job_runner.submit("archive_matured", run)
+    except background.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
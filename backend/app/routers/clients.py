@@ -1,58 +1,394 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import re
+from typing import List, Optional, Sequence, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.core import background
+from app.core.cache import client_detail_cache, client_full_cache
+from app.core.config import FORCE_DELETE_BATCH_SIZE
+from app.core.references import reference_registry
+from app.core.singleflight import client_flights
+from app.core.query_budget import query_budget
+from app.db.database import AsyncSessionLocal, BackgroundSessionLocal, get_db
+from app.schemas.background import BackgroundJob
 from app.schemas.client import (
     ClientSummary,
+    ClientSearchResult,
     ClientDetail,
     ClientFull,
+    ClientFullArchive,
     ClientCreate,
     ClientUpdate,
 )
+from app.schemas.finance import ArchivedLoan, Deposit, Loan
+from app.crud import archive as crud_archive
 from app.crud import client as crud_client
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
+# ETag format: "v<version>" for the detail view, "v<version>-full" for the dossier
+_ETAG_RE = re.compile(r'^(?:W/)?"v(\d+)(?:-full)?"$')
+
+
+def _etag(version: int, full: bool = False) -> str:
+    return f'"v{version}-full"' if full else f'"v{version}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Check an If-None-Match header value (list of tags or "*")."""
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _parse_if_match(header: str) -> Optional[int]:
+    """
+    Extract the expected client version from an If-Match header.
+    Returns None for "*" (any version), raises 412 for foreign tags.
+    """
+    if header.strip() == "*":
+        return None
+    match = _ETAG_RE.match(header.strip())
+    if match is None:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must contain a single client ETag",
+        )
+    return int(match.group(1))
+
+
+# --- Sparse fieldsets ---
+# ?fields=full_name,loans_outstanding selects client columns (id is always
+# returned), ?include=job,deposits.type selects relations. Sparse responses
+# are built from exactly what was loaded and skip the cache and ETags.
+
+_SUMMARY_RELATIONS = ("job",)
+_DETAIL_RELATIONS = ("job", "education_level", "marital_status")
+_FULL_RELATIONS = _DETAIL_RELATIONS + ("loans", "deposits.type")
+
+_FIELDS_QUERY = Query(
+    None, description="Comma-separated client columns to return (id is always included)"
+)
+_INCLUDE_QUERY = Query(
+    None,
+    description="Comma-separated relations to return: job, education_level, "
+    "marital_status, loans, deposits, deposits.type (empty for none)",
+)
+
+_DEPOSIT_FIELDS = [name for name in Deposit.model_fields if name != "type"]
+
+
+def _split_names(value: str) -> List[str]:
+    return list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+
+
+def _parse_fieldset(
+    fields: Optional[str], include: Optional[str], default_relations: Sequence[str]
+) -> Tuple[List[str], List[str]]:
+    """
+    Validate ?fields= and ?include=. A missing parameter means all columns,
+    respectively the relations the view returns by default.
+    """
+    columns = _split_names(fields) if fields is not None else list(crud_client.CLIENT_FIELDS)
+    relations = _split_names(include) if include is not None else list(default_relations)
+
+    unknown = [name for name in columns if name not in crud_client.CLIENT_FIELDS]
+    unknown += [name for name in relations if name not in crud_client.CLIENT_RELATIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    if "id" not in columns:
+        columns.insert(0, "id")
+    return columns, relations
+
+
+# --- References ---
+# job / education_level / marital_status and deposit types are attached by id
+# from the in-memory reference tables (core.references), never loaded with
+# the client. Callers await reference_registry.ensure() first.
+
+# include= name -> reference table
+_REFERENCE_TABLES = {
+    "job": "jobs",
+    "education_level": "education_levels",
+    "marital_status": "marital_statuses",
+}
+
+
+def _references(db_client, relations: Sequence[str]) -> dict:
+    return {
+        name: reference_registry.get(table, getattr(db_client, f"{name}_id"))
+        for name, table in _REFERENCE_TABLES.items()
+        if name in relations
+    }
+
+
+def _deposit(deposit, with_type: bool = True) -> dict:
+    item = {name: getattr(deposit, name) for name in _DEPOSIT_FIELDS}
+    if with_type:
+        item["type"] = reference_registry.get("deposit_types", deposit.type_id)
+    return item
+
+
+def _client(schema, db_client, relations: Sequence[str]):
+    """Build a ClientSummary/ClientDetail/ClientFull from the client row."""
+    data = {name: getattr(db_client, name) for name in crud_client.CLIENT_FIELDS}
+    data.update(_references(db_client, relations))
+    if "loans" in relations:
+        data["loans"] = [Loan.model_validate(loan) for loan in db_client.loans]
+    if "deposits.type" in relations:
+        data["deposits"] = [_deposit(deposit) for deposit in db_client.deposits]
+    return schema.model_validate(data)
+
+
+def _dump_sparse(db_client, columns: Sequence[str], relations: Sequence[str]) -> dict:
+    """Serialize only the loaded columns/relations of a client."""
+    data = {name: getattr(db_client, name) for name in columns}
+    data.update(_references(db_client, relations))
+
+    if "loans" in relations:
+        data["loans"] = [Loan.model_validate(loan) for loan in db_client.loans]
+
+    if "deposits" in relations or "deposits.type" in relations:
+        with_type = "deposits.type" in relations
+        data["deposits"] = [_deposit(deposit, with_type) for deposit in db_client.deposits]
+
+    return data
+
+
+async def _read_client_sparse(
+    db: AsyncSession,
+    client_id: int,
+    fields: Optional[str],
+    include: Optional[str],
+    default_relations: Sequence[str],
+) -> JSONResponse:
+    columns, relations = _parse_fieldset(fields, include, default_relations)
+    await reference_registry.ensure()
+    db_client = await crud_client.get_client_sparse(db, client_id, columns, relations)
+    if db_client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return JSONResponse(jsonable_encoder(_dump_sparse(db_client, columns, relations)))
+
+
+async def _read_client_archive(db: AsyncSession, client_id: int) -> JSONResponse:
+    """Full dossier plus archived loans/deposits (uncached, no ETag)."""
+    await reference_registry.ensure()
+    db_client = await crud_client.get_client_full_by_id(db, client_id=client_id)
+    if db_client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    loans, deposits = await crud_archive.get_client_archive(db, client_id)
+
+    data = _client(ClientFull, db_client, _FULL_RELATIONS).model_dump()
+    data["archived_loans"] = [ArchivedLoan.model_validate(loan) for loan in loans]
+    data["archived_deposits"] = [
+        {**_deposit(deposit), "archived_at": deposit.archived_at} for deposit in deposits
+    ]
+    return JSONResponse(jsonable_encoder(ClientFullArchive.model_validate(data)))
+
+
+# --- Coalesced loads ---
+# Concurrent identical reads share one DB fetch (see core.singleflight).
+# The cache epoch is part of the key: a read that starts after an
+# invalidation never joins a fetch that began before it.
+
+
+async def _load_clients_page(skip: int, limit: int) -> List[ClientSummary]:
+    await reference_registry.ensure()
+    async with AsyncSessionLocal() as db:
+        db_clients = await crud_client.get_clients(db, skip=skip, limit=limit)
+        return [_client(ClientSummary, c, _SUMMARY_RELATIONS) for c in db_clients]
+
+
+async def _load_client_detail(client_id: int, epoch: int) -> Optional[ClientDetail]:
+    await reference_registry.ensure()
+    async with AsyncSessionLocal() as db:
+        db_client = await crud_client.get_client_by_id(db, client_id=client_id)
+        if db_client is None:
+            return None
+        client = _client(ClientDetail, db_client, _DETAIL_RELATIONS)
+    client_detail_cache.set(client_id, client, epoch)
+    return client
+
+
+async def _load_client_full(client_id: int, epoch: int) -> Optional[ClientFull]:
+    await reference_registry.ensure()
+    async with AsyncSessionLocal() as db:
+        db_client = await crud_client.get_client_full_by_id(db, client_id=client_id)
+        if db_client is None:
+            return None
+        client = _client(ClientFull, db_client, _FULL_RELATIONS)
+    client_full_cache.set(client_id, client, epoch)
+    return client
+
 
 @router.get("/", response_model=List[ClientSummary])
+@query_budget(3)  # page; include=: page + loans + deposits
 async def read_clients(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = _FIELDS_QUERY,
+    include: Optional[str] = _INCLUDE_QUERY,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Retreive a list of clients (Summary view).
+    With **fields** / **include** only the requested columns and relations
+    are selected and returned.
+    """
+    if fields is None and include is None:
+        return await client_flights.do(
+            ("list", skip, limit, client_detail_cache.epoch()),
+            lambda: _load_clients_page(skip, limit),
+        )
+
+    columns, relations = _parse_fieldset(fields, include, _SUMMARY_RELATIONS)
+    await reference_registry.ensure()
+    db_clients = await crud_client.get_clients_sparse(
+        db, columns, relations, skip=skip, limit=limit
+    )
+    return JSONResponse(
+        jsonable_encoder([_dump_sparse(c, columns, relations) for c in db_clients])
+    )
+
+
+@router.get("/search", response_model=List[ClientSearchResult])
+@query_budget(3)  # 2x set_config + clients
+async def search_clients(
+    q: str = Query(..., min_length=2, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    return await crud_client.get_clients(db, skip=skip, limit=limit)
+    Typo-tolerant search by full name, ranked by similarity.
+    """
+    await reference_registry.ensure()
+    matches = await crud_client.search_clients(db, q.strip(), limit=limit)
+    return [
+        ClientSearchResult(
+            **_client(ClientSummary, client, _SUMMARY_RELATIONS).model_dump(), score=score
+        )
+        for client, score in matches
+    ]
 
 
 @router.get("/{client_id}", response_model=ClientDetail)
-async def read_client(client_id: int, db: AsyncSession = Depends(get_db)):
+@query_budget(3)  # version + client; sparse: client + loans + deposits
+async def read_client(
+    client_id: int,
+    response: Response,
+    fields: Optional[str] = _FIELDS_QUERY,
+    include: Optional[str] = _INCLUDE_QUERY,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Retrieve a specific client information (Detailed view).
+    Served from the client cache when possible; concurrent misses share
+    one DB fetch.
+    Supports If-None-Match (304 is answered from a version lookup only).
+    **fields** / **include** return a sparse representation (uncached).
     """
-    db_client = await crud_client.get_client_by_id(db, client_id=client_id)
-    if db_client is None:
+    if fields is not None or include is not None:
+        return await _read_client_sparse(
+            db, client_id, fields, include, _DETAIL_RELATIONS
+        )
+
+    version = None
+    if if_none_match:
+        version = await crud_client.get_client_version(db, client_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        if _etag_matches(if_none_match, _etag(version)):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": _etag(version)},
+            )
+
+    cached = client_detail_cache.get(client_id)
+    if cached is not None and version in (None, cached.version):
+        response.headers["ETag"] = _etag(cached.version)
+        return cached
+
+    epoch = client_detail_cache.epoch()
+    client = await client_flights.do(
+        ("detail", client_id, epoch), lambda: _load_client_detail(client_id, epoch)
+    )
+    if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return db_client
+
+    response.headers["ETag"] = _etag(client.version)
+    return client
 
 
 @router.get("/{client_id}/full", response_model=ClientFull)
-async def read_client_full(client_id: int, db: AsyncSession = Depends(get_db)):
+@query_budget(5)  # version + client + loans + deposits; archived: + 2 archive tables
+async def read_client_full(
+    client_id: int,
+    response: Response,
+    fields: Optional[str] = _FIELDS_QUERY,
+    include: Optional[str] = _INCLUDE_QUERY,
+    include_archived: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Retrieve a FULL client dossier including loans and deposits.
+    Retrieve a FULL client dossier including active loans and deposits.
+    Served from the client cache when possible; concurrent misses share
+    one DB fetch.
+    Supports If-None-Match (304 is answered from a version lookup only).
+    **fields** / **include** return a sparse representation (uncached),
+    e.g. `?fields=full_name,loans_outstanding&include=loans`.
+    **include_archived=true** adds `archived_loans` / `archived_deposits`
+    (uncached; not combined with fields/include).
     """
-    db_client = await crud_client.get_client_full_by_id(db, client_id=client_id)
-    if db_client is None:
+    if include_archived:
+        if fields is not None or include is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="include_archived cannot be combined with fields/include",
+            )
+        return await _read_client_archive(db, client_id)
+
+    if fields is not None or include is not None:
+        return await _read_client_sparse(db, client_id, fields, include, _FULL_RELATIONS)
+
+    version = None
+    if if_none_match:
+        version = await crud_client.get_client_version(db, client_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        if _etag_matches(if_none_match, _etag(version, full=True)):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": _etag(version, full=True)},
+            )
+
+    cached = client_full_cache.get(client_id)
+    if cached is not None and version in (None, cached.version):
+        response.headers["ETag"] = _etag(cached.version, full=True)
+        return cached
+
+    epoch = client_full_cache.epoch()
+    client = await client_flights.do(
+        ("full", client_id, epoch), lambda: _load_client_full(client_id, epoch)
+    )
+    if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return db_client
+
+    response.headers["ETag"] = _etag(client.version, full=True)
+    return client
 
 
 # --- CREATE ---
 
 
 @router.post("/", response_model=ClientSummary, status_code=status.HTTP_201_CREATED)
+@query_budget(3)  # insert, notify, refresh
 async def create_client(
     client_in: ClientCreate,
     db: AsyncSession = Depends(get_db),
@@ -60,32 +396,54 @@ async def create_client(
     """
     Create a new client.
     """
-    return await crud_client.create_client(db, client_in)
+    await reference_registry.ensure()
+    db_client = await crud_client.create_client(db, client_in)
+    return _client(ClientSummary, db_client, _SUMMARY_RELATIONS)
 
 
 # --- UPDATE ---
 
 
 @router.put("/{client_id}", response_model=ClientDetail)
+@query_budget(4)  # update, version on conflict, notify, client
 async def update_client(
     client_id: int,
     client_in: ClientUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update an existing client.
     Only provided fields will be updated (partial update supported).
+
+    Send **If-Match** with the ETag from a previous GET to make sure nobody
+    changed the client in between (412 otherwise).
     """
-    db_client = await crud_client.update_client(db, client_id, client_in)
+    expected_version = _parse_if_match(if_match) if if_match else None
+    await reference_registry.ensure()
+    try:
+        db_client = await crud_client.update_client(
+            db, client_id, client_in, expected_version=expected_version
+        )
+    except crud_client.ClientVersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(e),
+            headers={"ETag": _etag(e.current_version)},
+        )
+
     if db_client is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return db_client
+    response.headers["ETag"] = _etag(db_client.version)
+    return _client(ClientDetail, db_client, _DETAIL_RELATIONS)
 
 
 # --- DELETE ---
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_200_OK)
+@query_budget(12)  # client, 3 counts, loans, deposits, 2 collection loads, 3 deletes, notify
 async def delete_client(
     client_id: int,
     force: bool = False,
@@ -94,8 +452,10 @@ async def delete_client(
     """
     Delete a client.
 
-    - **force=false** (default): Will fail if client has loans or deposits.
-    - **force=true**: Will delete client AND all related loans/deposits.
+    - **force=false** (default): Will fail if client has loans or deposits,
+      archived ones included.
+    - **force=true**: Will delete client AND all related loans/deposits,
+      archived ones included.
 
     Returns deletion statistics.
     """
@@ -108,3 +468,34 @@ async def delete_client(
         raise HTTPException(status_code=404, detail="Client not found")
 
     return result
+
+
+@router.post(
+    "/{client_id}/force-delete",
+    response_model=BackgroundJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@query_budget(3)  # version + job record
+async def force_delete_client(client_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Delete a client with all loans/deposits in the background.
+
+    Rows are removed in batches; poll **GET /jobs/{job_id}** for progress.
+    The job result has the same shape as DELETE /clients/{client_id}.
+    """
+    if await crud_client.get_client_version(db, client_id) is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    async def run(job: background.BackgroundJob) -> dict:
+        async with BackgroundSessionLocal() as job_db:
+            result = await crud_client.delete_client_in_batches(
+                job_db, client_id, FORCE_DELETE_BATCH_SIZE, on_progress=job.report
+            )
+        if result is None:
+            raise LookupError("Client not found")
+        return result
+
+    try:
+        return await background.job_runner.submit("client_force_delete", run)
+    except background.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import EVENTS_HEARTBEAT_SECONDS
+from app.core.events import Subscriber, change_feed
+from app.core.query_budget import query_budget
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def _parse_client_ids(value: Optional[str]) -> Optional[set[int]]:
+    if not value:
+        return None
+    try:
+        return {int(part) for part in value.split(",") if part.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="clients must be comma-separated ids")
+
+
+def _format(change: dict) -> str:
+    lines = [f"id: {change['id']}"] if change["id"] else []
+    lines += [f"event: {change['type']}", f"data: {json.dumps(change['data'])}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream(subscriber: Subscriber):
+    # Browsers reconnect after `retry` ms and send the last id they saw
+    yield "retry: 3000\n\n"
+    while True:
+        try:
+            change = await asyncio.wait_for(
+                subscriber.queue.get(), EVENTS_HEARTBEAT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            yield ": heartbeat\n\n"  # Keeps proxies from closing an idle stream
+            continue
+        yield _format(change)
+
+
+@router.get("")
+@query_budget(0)
+async def stream_events(
+    clients: Optional[str] = Query(
+        None, description="Comma-separated client ids to follow (default: all)"
+    ),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events stream of client, loan and deposit changes.
+
+    `change` events carry {"entity": "client" | "loan" | "deposit",
+    "op": "created" | "updated" | "deleted", "id", "client_id"}; a `reset`
+    event means events may have been missed and the page should refetch.
+    """
+    client_ids = _parse_client_ids(clients)
+    # Streams are exempt from admission control, this is their limit
+    if change_feed.full():
+        raise HTTPException(
+            status_code=503, detail="Too many event streams", headers={"Retry-After": "5"}
+        )
+
+    async def body():
+        async with change_feed.subscribe(client_ids, last_event_id) as subscriber:
+            async for chunk in _stream(subscriber):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
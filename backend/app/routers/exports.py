@@ -0,0 +1,60 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.core import background, snapshot
+from app.core.background import job_runner
+from app.core.query_budget import query_budget
+from app.schemas.background import BackgroundJob
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+
+@router.post(
+    "/snapshots",
+    response_model=BackgroundJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@query_budget(2)  # job record
+async def create_snapshot(
+    format: Literal["parquet", "arrow"] = "parquet",
+    tables: Optional[List[str]] = Query(None),
+):
+    """
+    Write a consistent columnar snapshot of clients, loans, deposits and the
+    reference tables (or only **tables**) in the background; poll
+    **GET /jobs/{job_id}**. The job result is the snapshot manifest.
+    """
+    unknown = [t for t in tables or [] if t not in snapshot.SNAPSHOT_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {unknown}")
+
+    async def run(job: background.BackgroundJob) -> dict:
+        return await snapshot.export_snapshot(format, tables, on_progress=job.report)
+
+    try:
+        return await job_runner.submit("snapshot_export", run)
+    except background.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+@router.get("/snapshots")
+@query_budget(0)
+async def read_snapshots():
+    """
+    Completed snapshots on this server, newest first, with their manifests.
+    """
+    return snapshot.list_snapshots()
+
+
+@router.get("/snapshots/{name}/{table}")
+@query_budget(0)
+async def download_snapshot_table(name: str, table: str):
+    """
+    Download the file of one table of a snapshot.
+    """
+    path = snapshot.snapshot_file(name, table)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Snapshot file not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
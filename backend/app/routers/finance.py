@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.query_budget import query_budget
 from app.db.database import get_db
 from app.schemas.finance import (
     Loan,
@@ -9,11 +14,51 @@ from app.schemas.finance import (
     Deposit,
     DepositCreate,
     DepositUpdate,
+    LoanPaymentBatch,
+    LoanPaymentBatchResult,
+    LoanBalance,
+    ClientBalance,
+    MaturityCalendar,
+    LoanBulkUpdate,
+    DepositBulkUpdate,
+    BulkUpdateResult,
 )
 from app.crud import finance as crud_finance
+from app.crud.idempotency import (
+    IdempotencyKeyConflict,
+    IdempotencyKeyReused,
+    IdempotentReplay,
+    IdempotentRequest,
+)
 
 router = APIRouter(prefix="/finance", tags=["Finance"])
 
+IDEMPOTENCY_KEY = Header(
+    None,
+    alias="Idempotency-Key",
+    max_length=255,
+    description="Retries with the same key return the first response instead of creating again",
+)
+
+
+async def _create_idempotent(create, db: AsyncSession, payload, scope: str, key: Optional[str]):
+    """
+    Run `create(db, payload, idempotent)`; a key seen before replays the
+    stored response (Idempotent-Replayed: true), or 422 when it came with
+    a different body (409 when that response was purged meanwhile).
+    """
+    idempotent = IdempotentRequest.of(scope, key, payload) if key else None
+    try:
+        return await create(db, payload, idempotent)
+    except IdempotentReplay as e:
+        return JSONResponse(
+            e.body, status_code=e.status_code, headers={"Idempotent-Replayed": "true"}
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
 
 # ============================================================================
 # LOANS
@@ -21,14 +66,25 @@ router = APIRouter(prefix="/finance", tags=["Finance"])
 
 
 @router.post("/loans", response_model=Loan, status_code=status.HTTP_201_CREATED)
-async def create_loan(loan_in: LoanCreate, db: AsyncSession = Depends(get_db)):
+@query_budget(7)  # key, version, insert, totals, stored response, notify, refresh
+async def create_loan(
+    loan_in: LoanCreate,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Issue a new loan for a client.
+
+    Send an **Idempotency-Key** to retry safely: the response is stored for
+    IDEMPOTENCY_TTL_SECONDS and a retry with the same key gets it back.
     """
-    return await crud_finance.create_loan(db, loan_in)
+    return await _create_idempotent(
+        crud_finance.create_loan, db, loan_in, "POST /finance/loans", idempotency_key
+    )
 
 
 @router.put("/loans/{loan_id}", response_model=Loan)
+@query_budget(6)  # loan, version, update, totals, notify, refresh
 async def update_loan(
     loan_id: int,
     loan_in: LoanUpdate,
@@ -45,6 +101,7 @@ async def update_loan(
 
 
 @router.delete("/loans/{loan_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)  # loan, version, delete, totals, notify
 async def delete_loan(
     loan_id: int,
     db: AsyncSession = Depends(get_db),
@@ -58,20 +115,158 @@ async def delete_loan(
     return None
 
 
+@router.patch("/loans", response_model=BulkUpdateResult)
+@query_budget(6)  # count, versions, update, versions of late matches, totals, notify
+async def bulk_update_loans(
+    bulk: LoanBulkUpdate,
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Change every loan matching `filter` (all conditions at once) in a single
+    UPDATE, e.g. raise interest_rate for the clients with a given job.
+
+    With **dry_run=true** nothing is changed, `matched` is how many loans
+    would be. At most BULK_UPDATE_MAX_ROWS loans per request (400 otherwise).
+    """
+    try:
+        return await crud_finance.bulk_update_loans(db, bulk, dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ============================================================================
+# LOAN PAYMENTS
+# ============================================================================
+
+
+@router.post(
+    "/payments",
+    response_model=LoanPaymentBatchResult,
+    status_code=status.HTTP_201_CREATED,
+)
+@query_budget(7)  # set_config (timeout), loans, payments, balances, versions, totals, notify
+async def append_payments(batch: LoanPaymentBatch, db: AsyncSession = Depends(get_db)):
+    """
+    Append a batch of loan payments to the ledger (up to 10 000 per request).
+    """
+    try:
+        return await crud_finance.append_loan_payments(db, batch.payments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/loans/{loan_id}/balance", response_model=LoanBalance)
+@query_budget(1)
+async def read_loan_balance(loan_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Outstanding principal of a loan.
+    """
+    balance = await crud_finance.get_loan_balance(db, loan_id)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Loan not found")
+    return balance
+
+
+@router.get("/clients/{client_id}/balance", response_model=ClientBalance)
+@query_budget(1)
+async def read_client_balance(client_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Outstanding principal over all loans of a client.
+    """
+    balance = await crud_finance.get_client_balance(db, client_id)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return balance
+
+
 # ============================================================================
 # DEPOSITS
 # ============================================================================
 
 
 @router.post("/deposits", response_model=Deposit, status_code=status.HTTP_201_CREATED)
-async def create_deposit(deposit_in: DepositCreate, db: AsyncSession = Depends(get_db)):
+@query_budget(8)  # key, version, insert, totals, deposit + type, stored response, notify
+async def create_deposit(
+    deposit_in: DepositCreate,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Open a new deposit for a client.
+
+    Send an **Idempotency-Key** to retry safely (see POST /finance/loans).
+    """
+    return await _create_idempotent(
+        crud_finance.create_deposit, db, deposit_in, "POST /finance/deposits", idempotency_key
+    )
+
+
+@router.patch("/deposits", response_model=BulkUpdateResult)
+@query_budget(6)  # count, versions, update, versions of late matches, totals, notify
+async def bulk_update_deposits(
+    bulk: DepositBulkUpdate,
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Change every deposit matching `filter` in a single UPDATE
+    (see PATCH /finance/loans).
+    """
+    try:
+        return await crud_finance.bulk_update_deposits(db, bulk, dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _maturity_range(from_date: Optional[date], to_date: Optional[date]) -> tuple[date, date]:
+    """Defaults: from today, to 30 days after `from`."""
+    from_date = from_date or date.today()
+    return from_date, to_date or from_date + timedelta(days=30)
+
+
+@router.get("/deposits/maturities", response_model=MaturityCalendar)
+@query_budget(1)
+async def read_deposit_maturities(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    bucket: Literal["day", "week", "month"] = "day",
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Money coming due: final_amount of deposits ending between `from` and
+    `to` (inclusive), per day/week/month and deposit type.
+    """
+    from_date, to_date = _maturity_range(from_date, to_date)
+    try:
+        return await crud_finance.get_deposit_maturities(db, from_date, to_date, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/deposits/maturities/deposits", response_model=List[Deposit])
+@query_budget(1)
+async def read_maturing_deposits(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    The individual deposits ending between `from` and `to`, by end date.
     """
-    return await crud_finance.create_deposit(db, deposit_in)
+    from_date, to_date = _maturity_range(from_date, to_date)
+    try:
+        return await crud_finance.get_maturing_deposits(
+            db, from_date, to_date, skip=skip, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/deposits/{deposit_id}", response_model=Deposit)
+@query_budget(8)  # deposit + type, version, update, totals, notify, deposit + type
 async def update_deposit(
     deposit_id: int,
     deposit_in: DepositUpdate,
@@ -88,6 +283,7 @@ async def update_deposit(
 
 
 @router.delete("/deposits/{deposit_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(6)  # deposit + type, version, delete, totals, notify
 async def delete_deposit(
     deposit_id: int,
     db: AsyncSession = Depends(get_db),
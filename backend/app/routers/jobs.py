@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+
+from app.core.background import job_runner
+from app.core.query_budget import query_budget
+from app.schemas.background import BackgroundJob
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=BackgroundJob)
+@query_budget(1)  # DB lookup for jobs of other workers
+async def read_job(job_id: str):
+    """
+    Retrieve status, progress and result of a background job
+    (works from any worker process).
+    """
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
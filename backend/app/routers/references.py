@@ -1,25 +1,34 @@
 from typing import List
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter
 
-from app.db.database import get_db
+from app.core.query_budget import query_budget
+from app.core.references import reference_registry
 from app.schemas.references import Job, EducationLevel, MaritalStatus, DepositType
-from app.crud import references as crud_ref
 
 router = APIRouter(prefix="/references", tags=["References"])
 
+
+async def get_reference_list(name: str) -> list:
+    """Reference lists are served from memory (see core.references)."""
+    await reference_registry.ensure()
+    return reference_registry.items(name)
+
 @router.get("/jobs", response_model=List[Job])
-async def read_jobs(db: AsyncSession = Depends(get_db)):
-    return await crud_ref.get_jobs(db)
+@query_budget(0)
+async def read_jobs():
+    return await get_reference_list("jobs")
 
 @router.get("/education-levels", response_model=List[EducationLevel])
-async def read_education_levels(db: AsyncSession = Depends(get_db)):
-    return await crud_ref.get_education_levels(db)
+@query_budget(0)
+async def read_education_levels():
+    return await get_reference_list("education_levels")
 
 @router.get("/marital-statuses", response_model=List[MaritalStatus])
-async def read_marital_statuses(db: AsyncSession = Depends(get_db)):
-    return await crud_ref.get_marital_statuses(db)
+@query_budget(0)
+async def read_marital_statuses():
+    return await get_reference_list("marital_statuses")
 
 @router.get("/deposit-types", response_model=List[DepositType])
-async def read_deposit_types(db: AsyncSession = Depends(get_db)):
-    return await crud_ref.get_deposit_types(db)
+@query_budget(0)
+async def read_deposit_types():
+    return await get_reference_list("deposit_types")
@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.core import background, stress
+from app.core.background import job_runner
+from app.core.config import STRESS_TEST_LOAD_BATCH_SIZE
+from app.core.query_budget import query_budget
+from app.crud import finance as crud_finance
+from app.db.database import BackgroundSessionLocal
+from app.schemas.background import BackgroundJob
+from app.schemas.risk import StressTestParams, StressTestResult
+
+router = APIRouter(prefix="/risk", tags=["Risk"])
+
+
+@router.post(
+    "/stress-tests",
+    response_model=BackgroundJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@query_budget(2)  # job record
+async def run_stress_test(params: Optional[StressTestParams] = None):
+    """
+    Monte Carlo stress test of all loans with unpaid principal under
+    default and rate shocks, in the background; poll **GET /jobs/{job_id}**.
+    The job result is the loss distribution: expected loss, VaR and
+    expected shortfall per confidence level, and a histogram.
+    """
+    params = params or StressTestParams()
+
+    async def run(job: background.BackgroundJob) -> StressTestResult:
+        async with BackgroundSessionLocal() as job_db:
+            portfolio = await stress.load_portfolio(
+                crud_finance.stream_loan_exposures(job_db, STRESS_TEST_LOAD_BATCH_SIZE),
+                date.today(),
+            )
+        job.report(0.0, f"Loaded {len(portfolio)} loans")
+        result = await stress.run_stress_test(
+            portfolio,
+            stress.StressParams(**params.model_dump()),
+            on_progress=job.report,
+        )
+        return StressTestResult.model_validate(result)
+
+    try:
+        return await job_runner.submit("loan_stress_test", run)
+    except background.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
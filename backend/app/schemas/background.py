@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Optional
+from app.schemas.common import ORMBase
+
+
+class BackgroundJob(ORMBase):
+    """Status of a job queued through one of the async (202) endpoints."""
+
+    id: str
+    kind: str
+    status: str
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -2,7 +2,7 @@ from typing import Optional, List
 from pydantic import Field
 from app.schemas.common import ORMBase
 from app.schemas.references import Job, EducationLevel, MaritalStatus
-from app.schemas.finance import Loan, Deposit
+from app.schemas.finance import ArchivedDeposit, ArchivedLoan, Loan, Deposit
 
 
 class ClientBase(ORMBase):
@@ -36,8 +36,22 @@ class ClientSummary(ClientBase):
     """
 
     id: int
+    version: int = 1
     job: Optional[Job] = None
 
+    # Finance totals stored on the client row (no joins needed)
+    loans_count: int = 0
+    loans_outstanding: float = 0.0
+    loans_overdue_amount: float = 0.0
+    deposits_count: int = 0
+    deposits_balance: float = 0.0
+
+
+class ClientSearchResult(ClientSummary):
+    """Client matched by GET /clients/search, with similarity score (0..1)."""
+
+    score: float
+
 
 class ClientDetail(ClientSummary):
     """
@@ -58,3 +72,13 @@ class ClientFull(ClientDetail):
 
     loans: List[Loan] = []
     deposits: List[Deposit] = []
+
+
+class ClientFullArchive(ClientFull):
+    """
+    Full dossier with the archived history (GET /clients/{id}/full
+    ?include_archived=true).
+    """
+
+    archived_loans: List[ArchivedLoan] = []
+    archived_deposits: List[ArchivedDeposit] = []
@@ -1,5 +1,6 @@
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import Field
 from app.schemas.common import ORMBase
 from app.schemas.references import DepositType
 
@@ -63,3 +64,117 @@ class Deposit(DepositBase):
     id: int
     client_id: int
     type: Optional[DepositType] = None  # Nested response for viewing details
+
+
+# --- Archive (loans_archive / deposits_archive) ---
+class ArchivedLoan(Loan):
+    archived_at: datetime
+
+
+class ArchivedDeposit(Deposit):
+    archived_at: datetime
+
+
+# --- Loan payments ---
+class LoanPaymentCreate(ORMBase):
+    loan_id: int
+    amount: float = Field(..., gt=0)
+    paid_at: Optional[datetime] = None  # Defaults to the time of the request
+
+
+class LoanPaymentBatch(ORMBase):
+    payments: List[LoanPaymentCreate] = Field(..., min_length=1, max_length=10_000)
+
+
+class LoanPaymentBatchResult(ORMBase):
+    inserted: int
+    loans: int
+
+
+class LoanBalance(ORMBase):
+    """Principal minus payments (interest is not accrued)."""
+
+    loan_id: int
+    client_id: int
+    amount: float
+    paid_total: float
+    outstanding: float
+    payments_count: int
+    last_payment_at: Optional[datetime] = None
+
+
+class ClientBalance(ORMBase):
+    client_id: int
+    loans_count: int
+    amount_total: float
+    paid_total: float
+    outstanding: float
+
+
+# --- Deposit maturity calendar ---
+class MaturityTypeTotal(ORMBase):
+    type_id: int
+    type_name: str
+    deposits_count: int
+    final_amount: float
+
+
+class MaturityBucket(ORMBase):
+    start: date  # First day of the day/week/month
+    deposits_count: int
+    final_amount: float
+    types: List[MaturityTypeTotal]
+
+
+class MaturityCalendar(ORMBase):
+    from_date: date
+    to_date: date
+    bucket: str
+    deposits_count: int
+    final_amount: float
+    buckets: List[MaturityBucket]  # Only buckets with maturing deposits
+
+
+# --- Bulk updates (PATCH /finance/loans, PATCH /finance/deposits) ---
+class LoanFilter(ORMBase):
+    """Loans matching all of the given conditions."""
+
+    client_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10_000)
+    job_id: Optional[int] = None  # Job of the client
+    is_overdue: Optional[bool] = None
+    end_date_from: Optional[date] = None
+    end_date_to: Optional[date] = None
+
+
+class LoanBulkUpdate(ORMBase):
+    filter: LoanFilter
+    changes: LoanUpdate
+
+
+class DepositFilter(ORMBase):
+    """Deposits matching all of the given conditions."""
+
+    client_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10_000)
+    job_id: Optional[int] = None  # Job of the client
+    type_id: Optional[int] = None
+    end_date_from: Optional[date] = None
+    end_date_to: Optional[date] = None
+
+
+class DepositBulkUpdate(ORMBase):
+    filter: DepositFilter
+    changes: DepositUpdate
+
+
+class BulkUpdateResult(ORMBase):
+    dry_run: bool
+    matched: int
+    ids: List[int]  # Updated rows, empty for a dry run
+
+
+# --- Overdue sweep ---
+class OverdueSweepResult(ORMBase):
+    as_of: date
+    updated: int
+    batches: int
+    clients: int
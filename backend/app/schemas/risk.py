@@ -0,0 +1,54 @@
+from typing import Dict, List, Optional
+from pydantic import Field, field_validator
+from app.core.config import STRESS_TEST_MAX_SCENARIOS
+from app.schemas.common import ORMBase
+
+
+# --- Loan portfolio stress test ---
+class StressTestParams(ORMBase):
+    """
+    Scenario settings; probabilities are per loan over the horizon, rates
+    are absolute (0.01 = +1 percentage point).
+    """
+
+    scenarios: int = Field(10_000, ge=100, le=STRESS_TEST_MAX_SCENARIOS)
+    horizon_years: float = Field(1.0, gt=0, le=30)
+    default_probability: float = Field(0.02, gt=0, lt=1)
+    overdue_default_probability: float = Field(0.35, gt=0, lt=1)
+    correlation: float = Field(0.15, ge=0, lt=1)  # Weight of the economy factor
+    loss_given_default: float = Field(0.45, ge=0, le=1)
+    rate_shock_mean: float = Field(0.0, ge=-1, le=1)
+    rate_shock_std: float = Field(0.01, ge=0, le=1)
+    # Shift of the default threshold (in standard deviations) per +1.0 of rate
+    rate_sensitivity: float = Field(20.0, ge=0, le=1000)
+    confidence_levels: List[float] = Field([0.95, 0.99, 0.999], min_length=1, max_length=10)
+    seed: Optional[int] = Field(None, ge=0)  # Same seed, same result
+
+    @field_validator("confidence_levels")
+    @classmethod
+    def check_levels(cls, levels: List[float]) -> List[float]:
+        if any(not 0 < level < 1 for level in levels):
+            raise ValueError("confidence levels must be between 0 and 1")
+        return sorted(set(levels))
+
+
+class LossHistogram(ORMBase):
+    edges: List[float]
+    counts: List[int]
+
+
+class StressTestResult(ORMBase):
+    """Result of a stress-test job (GET /jobs/{job_id} -> result)."""
+
+    loans: int
+    overdue_loans: int
+    exposure: float
+    scenarios: int
+    expected_loss: float
+    loss_std: float
+    max_loss: float
+    var: Dict[str, float]  # Loss not exceeded at each confidence level
+    expected_shortfall: Dict[str, float]  # Mean loss beyond the VaR
+    histogram: LossHistogram
+    params: StressTestParams
+    elapsed_seconds: float
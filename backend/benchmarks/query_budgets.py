@@ -0,0 +1,390 @@
+"""
+Query budget check: calls every API route in-process against a real (seeded)
+database and counts the SQL statements each request executes.
+
+Every route must declare @query_budget (app/core/query_budget.py). The check
+fails when
+- a route has no budget or is not exercised here,
+- a request runs more statements than its budget,
+- a request runs more statements for a client with many loans/deposits than
+  for a client with one (N+1 queries).
+
+The probe clients it creates are deleted at the end.
+
+Run from backend/ with the database migrated (e.g. after `python startup.py`):
+    python -m benchmarks.query_budgets
+or `make query-budgets` from the repository root (compose database, as CI
+does). Exit status is 1 when a check fails.
+"""
+import asyncio
+import importlib
+import json
+import os
+import pkgutil
+import sys
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+os.environ["QUERY_BUDGET_MODE"] = "header"
+os.environ.setdefault("DB_ECHO", "false")
+
+from fastapi.routing import APIRoute  # noqa: E402
+
+import app.routers as routers_package  # noqa: E402
+from app.core.query_budget import endpoint_query_budget  # noqa: E402
+from main import app  # noqa: E402
+
+PREFIX = "/api/v1"
+# Loans and deposits of the probe client in the two rounds
+ROUNDS = (1, 20)
+
+
+class Probe:
+    """Calls the app over ASGI and records statement counts per route."""
+
+    def __init__(self):
+        # (method, route template, variant) -> statements per round
+        self.counts: dict[tuple[str, str, str], dict[int, int]] = defaultdict(dict)
+        self.errors: list[str] = []
+        self.round = 0
+
+    async def call(
+        self,
+        method: str,
+        path: str,
+        body: Any = None,
+        query: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        variant: str = "",
+        expect: tuple[int, ...] = (200, 201, 202, 204, 304),
+        stream: bool = False,
+    ) -> tuple[int, dict, Any]:
+        """
+        stream=True disconnects once the response has started (for
+        endpoints that never finish their body, like the event stream).
+        """
+        payload = json.dumps(body).encode() if body is not None else b""
+        raw_headers = [(b"host", b"test"), (b"content-type", b"application/json")]
+        raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": PREFIX + path,
+            "raw_path": (PREFIX + path).encode(),
+            "query_string": urlencode(query or {}).encode(),
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 1),
+            "server": ("test", 80),
+        }
+
+        finished = asyncio.Event()
+        sent_body = False
+        response: dict[str, Any] = {"headers": {}, "body": b""}
+
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {
+                    k.decode(): v.decode() for k, v in message.get("headers", [])
+                }
+                if stream:
+                    finished.set()
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+                if not message.get("more_body", False):
+                    finished.set()
+
+        await app(scope, receive, send)
+
+        status = response["status"]
+        route = scope.get("route")
+        template = route.path.removeprefix(PREFIX) if route else path
+        if status not in expect:
+            self.errors.append(
+                f"{method} {template} {variant}: HTTP {status} {response['body'][:200]!r}"
+            )
+        if "x-query-count" in response["headers"]:
+            count = int(response["headers"]["x-query-count"])
+            self.counts[(method, template, variant)][self.round] = count
+
+        if stream:
+            return status, response["headers"], None
+        is_json = response["headers"].get("content-type", "").startswith("application/json")
+        content = json.loads(response["body"]) if is_json and response["body"] else None
+        return status, response["headers"], content
+
+
+async def exercise(probe: Probe, items: int) -> None:
+    """One round: a probe client with `items` loans and deposits, every route."""
+    today = date.today()
+    name = f"Проверка Бюджета {uuid.uuid4().hex[:8]}"
+
+    _, _, deposit_types = await probe.call("GET", "/references/deposit-types")
+    for path in ("/references/jobs", "/references/education-levels", "/references/marital-statuses"):
+        await probe.call("GET", path)
+
+    _, _, client = await probe.call("POST", "/clients/", {"full_name": name, "age": 40})
+    client_id = client["id"]
+
+    loan_ids, deposit_ids = [], []
+    for _ in range(items):
+        _, _, loan = await probe.call(
+            "POST",
+            "/finance/loans",
+            {
+                "client_id": client_id,
+                "amount": 1000.0,
+                "interest_rate": 0.1,
+                "start_date": today.isoformat(),
+                "end_date": (today + timedelta(days=365)).isoformat(),
+            },
+        )
+        loan_ids.append(loan["id"])
+        _, _, deposit = await probe.call(
+            "POST",
+            "/finance/deposits",
+            {
+                "client_id": client_id,
+                "type_id": deposit_types[0]["id"],
+                "amount": 500.0,
+                "interest_rate": 0.05,
+                "start_date": today.isoformat(),
+                "end_date": (today + timedelta(days=365)).isoformat(),
+                "final_amount": 525.0,
+            },
+        )
+        deposit_ids.append(deposit["id"])
+
+    # Idempotent create, its retry (replayed) and the key reused for another body
+    loan_in = {
+        "client_id": client_id,
+        "amount": 1000.0,
+        "interest_rate": 0.1,
+        "start_date": today.isoformat(),
+        "end_date": (today + timedelta(days=365)).isoformat(),
+    }
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    _, _, loan = await probe.call(
+        "POST", "/finance/loans", loan_in, headers=key, variant="idempotency-key"
+    )
+    loan_ids.append(loan["id"])
+    _, headers, replayed = await probe.call(
+        "POST", "/finance/loans", loan_in, headers=key, variant="replay"
+    )
+    if replayed != loan or headers.get("idempotent-replayed") != "true":
+        probe.errors.append(f"POST /finance/loans replay: {replayed!r} != {loan!r}")
+    await probe.call(
+        "POST",
+        "/finance/loans",
+        {**loan_in, "amount": 2000.0},
+        headers=key,
+        variant="key-reused",
+        expect=(422,),
+    )
+    _, _, deposit = await probe.call(
+        "POST",
+        "/finance/deposits",
+        {
+            "client_id": client_id,
+            "type_id": deposit_types[0]["id"],
+            "amount": 500.0,
+            "interest_rate": 0.05,
+            "start_date": today.isoformat(),
+            "end_date": (today + timedelta(days=365)).isoformat(),
+            "final_amount": 525.0,
+        },
+        headers={"Idempotency-Key": uuid.uuid4().hex},
+        variant="idempotency-key",
+    )
+    deposit_ids.append(deposit["id"])
+
+    await probe.call(
+        "POST",
+        "/finance/payments",
+        {"payments": [{"loan_id": loan_id, "amount": 10.0} for loan_id in loan_ids]},
+    )
+
+    # Reads
+    await probe.call("GET", "/events", query={"clients": str(client_id)}, stream=True)
+    await probe.call("GET", "/clients/", query={"limit": 50})
+    await probe.call(
+        "GET",
+        "/clients/",
+        query={"limit": 50, "fields": "full_name", "include": "loans,deposits.type"},
+        variant="sparse",
+    )
+    await probe.call("GET", "/clients/search", query={"q": name})
+    _, headers, _ = await probe.call("GET", f"/clients/{client_id}")
+    await probe.call(
+        "GET",
+        f"/clients/{client_id}",
+        headers={"If-None-Match": headers["etag"]},
+        variant="if-none-match",
+    )
+    _, headers, _ = await probe.call("GET", f"/clients/{client_id}/full")
+    await probe.call(
+        "GET",
+        f"/clients/{client_id}/full",
+        headers={"If-None-Match": headers["etag"]},
+        variant="if-none-match",
+    )
+    await probe.call(
+        "GET",
+        f"/clients/{client_id}/full",
+        query={"fields": "full_name,loans_outstanding", "include": "loans,deposits.type"},
+        variant="sparse",
+    )
+    await probe.call(
+        "GET",
+        f"/clients/{client_id}/full",
+        query={"include_archived": "true"},
+        variant="include-archived",
+    )
+    await probe.call("GET", f"/finance/loans/{loan_ids[0]}/balance")
+    await probe.call("GET", f"/finance/clients/{client_id}/balance")
+    maturities = {"from": today.isoformat(), "to": (today + timedelta(days=400)).isoformat()}
+    await probe.call("GET", "/finance/deposits/maturities", query={**maturities, "bucket": "week"})
+    await probe.call("GET", "/finance/deposits/maturities/deposits", query=maturities)
+
+    # Updates
+    await probe.call("PUT", f"/clients/{client_id}", {"age": 41})
+    await probe.call("PUT", f"/finance/loans/{loan_ids[0]}", {"interest_rate": 0.12})
+    await probe.call("PUT", f"/finance/deposits/{deposit_ids[0]}", {"interest_rate": 0.06})
+    for dry_run in ("true", "false"):
+        await probe.call(
+            "PATCH",
+            "/finance/loans",
+            {"filter": {"client_ids": [client_id]}, "changes": {"interest_rate": 0.11}},
+            query={"dry_run": dry_run},
+            variant="dry-run" if dry_run == "true" else "",
+        )
+        await probe.call(
+            "PATCH",
+            "/finance/deposits",
+            {
+                "filter": {"client_ids": [client_id], "type_id": deposit_types[0]["id"]},
+                "changes": {"interest_rate": 0.055},
+            },
+            query={"dry_run": dry_run},
+            variant="dry-run" if dry_run == "true" else "",
+        )
+    await probe.call("DELETE", f"/finance/loans/{loan_ids.pop()}")
+    await probe.call("DELETE", f"/finance/deposits/{deposit_ids.pop()}")
+
+    # Admin
+    await probe.call("GET", "/admin/metrics")
+    await probe.call("GET", "/admin/slow-queries")
+    await probe.call("POST", "/admin/overdue-sweep")
+    _, _, reconcile_job = await probe.call("POST", "/admin/reconcile-totals")
+    _, _, archive_job = await probe.call("POST", "/admin/archive")
+    _, _, stress_job = await probe.call(
+        "POST", "/risk/stress-tests", {"scenarios": 100, "seed": 1}
+    )
+
+    # Deletes: the probe client directly, a second one through the job
+    await probe.call("DELETE", f"/clients/{client_id}", query={"force": "true"})
+    _, _, spare = await probe.call("POST", "/clients/", {"full_name": name, "age": 30})
+    _, _, job = await probe.call("POST", f"/clients/{spare['id']}/force-delete")
+    await probe.call("GET", f"/jobs/{job['id']}")
+
+    _, _, snapshot_job = await probe.call(
+        "POST", "/exports/snapshots", query={"tables": "deposit_types"}
+    )
+    for pending in (job, reconcile_job, archive_job, stress_job, snapshot_job):
+        while True:
+            _, _, state = await probe.call("GET", f"/jobs/{pending['id']}", variant="poll")
+            if state["status"] == "failed":
+                probe.errors.append(f"Job {state['kind']} failed: {state['error']}")
+            if state["status"] in ("succeeded", "failed"):
+                break
+            await asyncio.sleep(0.2)
+
+    _, _, snapshots = await probe.call("GET", "/exports/snapshots")
+    await probe.call("GET", f"/exports/snapshots/{snapshots[0]['name']}/deposit_types")
+
+
+def api_routes() -> list[APIRoute]:
+    """Routes of every module in app/routers (paths without PREFIX)."""
+    routes = []
+    for module_info in pkgutil.iter_modules(routers_package.__path__):
+        module = importlib.import_module(f"app.routers.{module_info.name}")
+        router = getattr(module, "router", None)
+        if router is not None:
+            routes += [route for route in router.routes if isinstance(route, APIRoute)]
+    return routes
+
+
+def report(probe: Probe) -> list[str]:
+    failures = list(probe.errors)
+    small, large = ROUNDS
+    exercised = {(method, template) for method, template, _ in probe.counts}
+
+    print(f"{'route':<52}{'budget':>8}{small:>6}{large:>6}")
+    for route in api_routes():
+        template = route.path
+        budget = endpoint_query_budget(route.endpoint)
+        declared = hasattr(route.endpoint, "query_budget")
+        for method in sorted(route.methods):
+            if not declared:
+                failures.append(f"{method} {template}: no @query_budget")
+            if (method, template) not in exercised:
+                failures.append(f"{method} {template}: not exercised")
+                continue
+
+            for (m, t, variant), counts in probe.counts.items():
+                if (m, t) != (method, template) or variant == "poll":
+                    continue
+                label = f"{method} {template} {variant}".strip()
+                print(
+                    f"{label:<52}{budget if budget is not None else '-':>8}"
+                    f"{counts.get(small, '-'):>6}{counts.get(large, '-'):>6}"
+                )
+                if budget is None:
+                    continue
+                for items, count in counts.items():
+                    if count > budget:
+                        failures.append(
+                            f"{label}: {count} statements with {items} loans/deposits "
+                            f"(budget {budget})"
+                        )
+                if counts.get(large, 0) > counts.get(small, 0):
+                    failures.append(
+                        f"{label}: {counts[small]} -> {counts[large]} statements "
+                        f"from {small} to {large} loans/deposits"
+                    )
+    return failures
+
+
+async def main() -> int:
+    probe = Probe()
+    async with app.router.lifespan_context(app):
+        for items in ROUNDS:
+            probe.round = items
+            await exercise(probe, items)
+
+    failures = report(probe)
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nAll routes within their query budgets.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
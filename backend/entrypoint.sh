@@ -1,31 +1,19 @@
 #!/bin/bash
 set -e
 
-echo "⏳ Waiting for PostgreSQL to be ready..."
-
-# Ждём готовности PostgreSQL (до 30 секунд)
-max_attempts=30
-attempt=0
-until python -c "from app.db.database import engine; engine.connect()" 2>/dev/null; do
-    attempt=$((attempt + 1))
-    if [ $attempt -ge $max_attempts ]; then
-        echo "❌ PostgreSQL is not available after $max_attempts attempts"
-        exit 1
-    fi
-    echo "   Attempt $attempt/$max_attempts..."
-    sleep 1
-done
-
-echo "✅ PostgreSQL is ready!"
-
-# Применяем миграции
-echo "🔄 Running database migrations..."
-alembic upgrade head
-
-# Заполняем БД (с проверкой на дубликаты внутри скрипта)
-echo "🌱 Running database seeding..."
-python seed.py
+# Ожидание БД, миграции и seed (пропускаются, если уже выполнены)
+python startup.py
 
 # Запускаем сервер
+# APP_ENV=production: несколько воркеров (WEB_CONCURRENCY), без SQL-эха.
+# Каждый воркер сам делит DB_MAX_CONNECTIONS на WEB_CONCURRENCY (см. app/db/database.py)
+if [ "${APP_ENV:-development}" = "production" ]; then
+    export WEB_CONCURRENCY="${WEB_CONCURRENCY:-$(nproc)}"
+    export DB_ECHO="${DB_ECHO:-false}"
+    echo "🚀 Starting FastAPI server (production, $WEB_CONCURRENCY workers)..."
+    exec uvicorn main:app --host 0.0.0.0 --port 8000 \
+        --workers "$WEB_CONCURRENCY" --no-access-log --proxy-headers
+fi
+
 echo "🚀 Starting FastAPI server..."
 exec uvicorn main:app --host 0.0.0.0 --port 8000
@@ -1,7 +1,114 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import AdmissionMiddleware, admission
+from app.core.background import job_runner
+from app.core.events import change_feed
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.references import reference_registry
+from app.core.config import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_INTERVAL_SECONDS,
+    IDEMPOTENCY_PURGE_BATCH_SIZE,
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+    OVERDUE_SWEEP_BATCH_SIZE,
+    OVERDUE_SWEEP_INTERVAL_SECONDS,
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+    PARTITION_MONTHS_AHEAD,
+    STARTUP_REPORT_PATH,
+)
+from app.core.scheduler import scheduler
+from app.core.timeouts import RequestTimeoutMiddleware, query_timeout_handler
+from app.crud import archive as crud_archive
+from app.crud import finance as crud_finance
+from app.crud import idempotency as crud_idempotency
+from app.crud import maintenance as crud_maintenance
+from app.db.database import engine, warm_up_pool
+from app.routers import clients, references, finance, admin, jobs, risk, exports, events
+
+logger = logging.getLogger(__name__)
+
 
-from app.routers import clients, references, finance
+async def partition_maintenance(db: AsyncSession) -> int:
+    return await crud_maintenance.ensure_future_partitions(db, PARTITION_MONTHS_AHEAD)
+
+
+async def overdue_sweep(db: AsyncSession) -> dict:
+    return await crud_finance.sweep_overdue_loans(
+        db, date.today(), OVERDUE_SWEEP_BATCH_SIZE
+    )
+
+
+async def archive_matured(db: AsyncSession) -> dict:
+    return await crud_archive.archive_matured(
+        db, date.today(), ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+    )
+
+
+async def idempotency_purge(db: AsyncSession) -> int:
+    return await crud_idempotency.purge_idempotency_keys(
+        db, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_PURGE_BATCH_SIZE
+    )
+
+
+scheduler.add(
+    "partition_maintenance", PARTITION_MAINTENANCE_INTERVAL_SECONDS, partition_maintenance
+)
+scheduler.add("overdue_sweep", OVERDUE_SWEEP_INTERVAL_SECONDS, overdue_sweep)
+scheduler.add("archive_matured", ARCHIVE_INTERVAL_SECONDS, archive_matured)
+scheduler.add("idempotency_purge", IDEMPOTENCY_PURGE_INTERVAL_SECONDS, idempotency_purge)
+
+
+async def warm_up() -> None:
+    """
+    Open pool connections and load the reference tables.
+    Runs before the worker starts accepting requests.
+    """
+    try:
+        await warm_up_pool()
+        await reference_registry.ensure()
+    except Exception:
+        logger.exception("Warm-up failed, starting with cold pool and caches")
+
+
+def read_startup_report() -> dict | None:
+    """Phase timings written by startup.py (missing when run without it)."""
+    try:
+        with open(STARTUP_REPORT_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await warm_up()
+    await job_runner.start()
+    scheduler.start()
+    change_feed.start()
+    app.state.startup = {
+        "database": read_startup_report(),
+        "worker_warm_up_seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info("Worker ready: %s", app.state.startup)
+    yield
+    await change_feed.stop()
+    await scheduler.stop()
+    await job_runner.stop()
+    await engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -11,8 +118,20 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
+    # Statements per request vs. the endpoint's declared budget
+    app.add_middleware(QueryBudgetMiddleware)
+
+    # Admission control (inside CORS, so 503s carry CORS headers too)
+    app.add_middleware(AdmissionMiddleware, control=admission)
+
+    # Statement timeout budgets; cancels requests (also queued ones) whose
+    # client went away
+    app.add_middleware(RequestTimeoutMiddleware)
+    app.add_exception_handler(DBAPIError, query_timeout_handler)
+
     # CORS Configuration
     app.add_middleware(
         CORSMiddleware,
@@ -20,17 +139,37 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Retry-After", "X-Query-Count", "X-Query-Budget"],
     )
 
     # Include Routers
     app.include_router(references.router, prefix="/api/v1")
     app.include_router(clients.router, prefix="/api/v1")
     app.include_router(finance.router, prefix="/api/v1")
+    app.include_router(jobs.router, prefix="/api/v1")
+    app.include_router(risk.router, prefix="/api/v1")
+    app.include_router(exports.router, prefix="/api/v1")
+    app.include_router(events.router, prefix="/api/v1")
+    app.include_router(admin.router, prefix="/api/v1")
 
     @app.get("/health", tags=["Health"])
     def health():
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["Health"])
+    async def ready(response: Response):
+        """
+        Readiness probe: the worker finished warm-up and the DB answers.
+        Also reports how long startup took.
+        """
+        try:
+            async with engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=2)
+        except Exception as e:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+            return {"status": "unavailable", "detail": repr(e)}
+        return {"status": "ready", "startup": getattr(app.state, "startup", None)}
+
     return app
 
 
@@ -6,7 +6,8 @@ from datetime import timedelta
 from faker import Faker
 from sqlalchemy import select, func
 
-from app.db.database import AsyncSessionLocal
+from app.crud.client import refresh_client_totals
+from app.db.database import BackgroundSessionLocal
 from app.db.models import (
     Client,
     Deposit,
@@ -178,7 +179,7 @@ async def seed_deposits(
 
 
 async def seed_database():
-    async with AsyncSessionLocal() as db:
+    async with BackgroundSessionLocal() as db:
         try:
             if await is_database_seeded(db):
                 print("✅ Database already seeded, skipping...")
@@ -201,6 +202,10 @@ async def seed_database():
             loans = await seed_loans(db, clients)
             deposits = await seed_deposits(db, clients, deposit_types)
 
+            # Итоги по кредитам/депозитам в строках клиентов
+            await db.flush()
+            await refresh_client_totals(db, [client.id for client in clients])
+
             await db.commit()
 
             # Статистика
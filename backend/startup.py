@@ -0,0 +1,118 @@
+# startup.py
+"""
+Подготовка БД перед запуском сервера (вызывается из entrypoint.sh):
+ждём PostgreSQL, применяем миграции и заполняем БД только если нужно.
+
+Не импортирует приложение: проверки идут через одно asyncpg-соединение,
+seed.py (и вместе с ним всё приложение) импортируется только для пустой БД.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+import asyncpg
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from app.core.config import (
+    PARTITION_MONTHS_AHEAD,
+    STARTUP_DB_ATTEMPTS,
+    STARTUP_DB_MAX_DELAY_SECONDS,
+    STARTUP_REPORT_PATH,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def database_dsn() -> str:
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise ValueError("DATABASE_URL is not set. Please check your .env file.")
+    # asyncpg expects a plain libpq-style URL
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def wait_for_db(dsn: str) -> asyncpg.Connection:
+    """Подключение с экспоненциальной задержкой (0.1с, 0.2с, ... до максимума)"""
+    delay = 0.1
+    for attempt in range(1, STARTUP_DB_ATTEMPTS):
+        try:
+            return await asyncpg.connect(dsn, timeout=5)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+            print(f"   Attempt {attempt}/{STARTUP_DB_ATTEMPTS}: {e!r}, retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STARTUP_DB_MAX_DELAY_SECONDS)
+    # Последняя попытка: ошибка пробрасывается наружу
+    return await asyncpg.connect(dsn, timeout=5)
+
+
+async def current_revision(conn: asyncpg.Connection) -> Optional[str]:
+    if not await conn.fetchval("SELECT to_regclass('alembic_version') IS NOT NULL"):
+        return None
+    return await conn.fetchval("SELECT version_num FROM alembic_version")
+
+
+async def is_database_seeded(conn: asyncpg.Connection) -> bool:
+    return await conn.fetchval("SELECT EXISTS (SELECT 1 FROM clients)")
+
+
+async def run_seed() -> None:
+    from app.db.database import engine
+    from seed import seed_database
+
+    await seed_database()
+    await engine.dispose()
+
+
+async def main() -> dict:
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+
+    def mark(phase: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[phase] = round(now - since, 3)
+        return now
+
+    print("⏳ Waiting for PostgreSQL to be ready...")
+    conn = await wait_for_db(database_dsn())
+    step = mark("wait_for_db", started)
+    print("✅ PostgreSQL is ready!")
+
+    try:
+        alembic_cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+        head = ScriptDirectory.from_config(alembic_cfg).get_current_head()
+        revision = await current_revision(conn)
+        if revision == head:
+            print(f"✅ Database is at head ({head}), skipping migrations")
+        else:
+            print(f"🔄 Running database migrations ({revision} -> {head})...")
+            await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+        step = mark("migrations", step)
+
+        created = await conn.fetchval(
+            "SELECT ensure_future_partitions($1)", PARTITION_MONTHS_AHEAD
+        )
+        if created:
+            print(f"🗂️  Created {created} loans/deposits partition(s)")
+        step = mark("partitions", step)
+
+        if await is_database_seeded(conn):
+            print("✅ Database already seeded, skipping...")
+        else:
+            await run_seed()
+        step = mark("seed", step)
+    finally:
+        await conn.close()
+
+    timings["total"] = round(time.perf_counter() - started, 3)
+    return timings
+
+
+if __name__ == "__main__":
+    report = asyncio.run(main())
+    print(f"⏱️  Startup finished in {report['total']}s: {report}")
+    with open(STARTUP_REPORT_PATH, "w") as f:
+        json.dump(report, f)
@@ -1,6 +1,7 @@
 import { api } from '@shared/api';
 import type {
     ClientSummary,
+    ClientSearchResult,
     ClientDetail,
     ClientFull,
     ClientCreate,
@@ -22,12 +23,32 @@ export const clientsApi = {
         return data;
     },
 
+    // Fuzzy search by full name (ranked, typo-tolerant)
+    search: async (query: string, limit = 50): Promise<ClientSearchResult[]> => {
+        const { data } = await api.get<ClientSearchResult[]>('/clients/search', {
+            params: { q: query, limit },
+        });
+        return data;
+    },
+
     // Get client by ID (detail view)
     getById: async (id: number): Promise<ClientDetail> => {
         const { data } = await api.get<ClientDetail>(`/clients/${id}`);
         return data;
     },
 
+    // Get one client in the summary view shape (sparse fieldset of the detail endpoint)
+    getSummary: async (id: number): Promise<ClientSummary> => {
+        const { data } = await api.get<ClientSummary>(`/clients/${id}`, {
+            params: {
+                fields: 'version,full_name,age,is_bankrupt,loans_count,loans_outstanding,'
+                    + 'loans_overdue_amount,deposits_count,deposits_balance',
+                include: 'job',
+            },
+        });
+        return data;
+    },
+
     // Get client full info (with loans and deposits)
     getFull: async (id: number): Promise<ClientFull> => {
         const { data } = await api.get<ClientFull>(`/clients/${id}/full`);
@@ -7,6 +7,7 @@ export type {
     MaritalStatus,
     DepositType,
     ClientSummary,
+    ClientSearchResult,
     ClientDetail,
     ClientFull,
     ClientCreate,
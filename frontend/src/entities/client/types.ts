@@ -22,15 +22,28 @@ export interface MaritalStatus {
 // Client from GET /clients/ (summary view)
 export interface ClientSummary {
     id: number;
+    version: number;
     full_name: string;
     age: number;
     is_bankrupt: boolean;
     job: Job;
+    // Finance totals stored on the client
+    loans_count: number;
+    loans_outstanding: number;
+    loans_overdue_amount: number;
+    deposits_count: number;
+    deposits_balance: number;
+}
+
+// Client from GET /clients/search (similarity score 0..1)
+export interface ClientSearchResult extends ClientSummary {
+    score: number;
 }
 
 // Client from GET /clients/{id} (detail view)
 export interface ClientDetail {
     id: number;
+    version: number;
     full_name: string;
     age: number;
     is_bankrupt: boolean;
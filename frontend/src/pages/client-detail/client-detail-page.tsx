@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import {
     ArrowLeft,
@@ -26,6 +26,7 @@ import {
     EmptyState,
     Modal,
     ModalFooter,
+    useChangeFeed,
 } from '@shared/index';
 import { clientsApi, financeApi, type ClientFull, type Loan, type Deposit } from '@entities/index';
 import { ClientFormModal, LoanFormModal, DepositFormModal } from '@features/index';
@@ -94,6 +95,29 @@ export const ClientDetailPage = () => {
         fetchClient();
     }, [id]);
 
+    // Live updates from other users; one refetch per burst of events
+    // (e.g. a payment batch touching many loans)
+    const refetchTimer = useRef<ReturnType<typeof setTimeout>>(undefined);
+    const scheduleRefetch = () => {
+        clearTimeout(refetchTimer.current);
+        refetchTimer.current = setTimeout(fetchClient, 200);
+    };
+    useEffect(() => () => clearTimeout(refetchTimer.current), []);
+
+    useChangeFeed(
+        {
+            onChange: (event) => {
+                if (event.entity === 'client' && event.op === 'deleted') {
+                    navigate('/clients');
+                } else {
+                    scheduleRefetch();
+                }
+            },
+            onReset: scheduleRefetch,
+        },
+        id ? [parseInt(id)] : [],
+    );
+
     // Handle Deletion
     const handleDeleteConfirm = async () => {
         if (!client) return;
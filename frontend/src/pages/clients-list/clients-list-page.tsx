@@ -1,12 +1,12 @@
 import { useEffect, useState, useMemo } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { Plus, Users, AlertTriangle, Search, ArrowUp, ArrowDown, ArrowUpDown } from 'lucide-react';
-import { Card, Button, Spinner, Badge, EmptyState, Input } from '@shared/index';
+import { Card, Button, Spinner, Badge, EmptyState, Input, useChangeFeed, type ChangeEvent } from '@shared/index';
 import { clientsApi, type ClientSummary } from '@entities/index';
 import { ClientFormModal } from '@features/index';
 import s from './clients-list-page.module.scss';
 
-type SortKey = 'full_name' | 'age' | 'salary' | null;
+type SortKey = 'full_name' | 'age' | 'salary' | 'debt' | 'deposits' | null;
 type SortDirection = 'asc' | 'desc';
 
 interface SortConfig {
@@ -22,6 +22,7 @@ export const ClientsListPage = () => {
 
     // Search & Sort State
     const [searchQuery, setSearchQuery] = useState('');
+    const [searchResults, setSearchResults] = useState<ClientSummary[] | null>(null);
     const [sortConfig, setSortConfig] = useState<SortConfig>({
         key: null,
         direction: 'asc',
@@ -47,12 +48,59 @@ export const ClientsListPage = () => {
         fetchClients();
     }, []);
 
+    // Live updates: patch the changed row instead of reloading the list
+    const applyChange = async (event: ChangeEvent) => {
+        if (event.entity === 'client' && event.op === 'deleted') {
+            setClients((prev) => prev.filter((c) => c.id !== event.client_id));
+            return;
+        }
+        try {
+            const summary = await clientsApi.getSummary(event.client_id);
+            setClients((prev) => {
+                const current = prev.find((c) => c.id === summary.id);
+                if (!current) return [...prev, summary];
+                // An older response must not overwrite a newer one
+                return current.version > summary.version
+                    ? prev
+                    : prev.map((c) => (c.id === summary.id ? summary : c));
+            });
+        } catch (err) {
+            console.error(err);  // Deleted meanwhile: its own event follows
+        }
+    };
+
+    useChangeFeed({ onChange: applyChange, onReset: fetchClients });
+
+    // Server-side fuzzy search (debounced), results come ranked by similarity
+    useEffect(() => {
+        const query = searchQuery.trim();
+        if (query.length < 2) {
+            setSearchResults(null);
+            return;
+        }
+
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const data = await clientsApi.search(query);
+                if (!cancelled) setSearchResults(data);
+            } catch (err) {
+                console.error(err);
+            }
+        }, 300);
+
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchQuery]);
+
     // Filter and Sort Logic
     const filteredAndSortedClients = useMemo(() => {
-        let result = [...clients];
+        let result = [...(searchResults ?? clients)];
 
-        // Filter
-        if (searchQuery) {
+        // Filter (single character: not worth a request)
+        if (searchResults === null && searchQuery) {
             const query = searchQuery.toLowerCase();
             result = result.filter((client) =>
                 client.full_name.toLowerCase().includes(query)
@@ -74,6 +122,12 @@ export const ClientsListPage = () => {
                 } else if (sortConfig.key === 'salary') {
                     aValue = a.job.salary;
                     bValue = b.job.salary;
+                } else if (sortConfig.key === 'debt') {
+                    aValue = a.loans_outstanding;
+                    bValue = b.loans_outstanding;
+                } else if (sortConfig.key === 'deposits') {
+                    aValue = a.deposits_balance;
+                    bValue = b.deposits_balance;
                 }
 
                 if (aValue < bValue) {
@@ -87,7 +141,7 @@ export const ClientsListPage = () => {
         }
 
         return result;
-    }, [clients, searchQuery, sortConfig]);
+    }, [clients, searchResults, searchQuery, sortConfig]);
 
     const handleSort = (key: SortKey) => {
         setSortConfig((current) => {
@@ -203,6 +257,22 @@ export const ClientsListPage = () => {
                                                 Salary {getSortIcon('salary')}
                                             </div>
                                         </th>
+                                        <th
+                                            className={s.sortableHeader}
+                                            onClick={() => handleSort('debt')}
+                                        >
+                                            <div className={s.headerContent}>
+                                                Loans {getSortIcon('debt')}
+                                            </div>
+                                        </th>
+                                        <th
+                                            className={s.sortableHeader}
+                                            onClick={() => handleSort('deposits')}
+                                        >
+                                            <div className={s.headerContent}>
+                                                Deposits {getSortIcon('deposits')}
+                                            </div>
+                                        </th>
                                         <th>Status</th>
                                     </tr>
                                 </thead>
@@ -233,6 +303,19 @@ export const ClientsListPage = () => {
                                             <td className={s.salaryCell}>
                                                 {client.job.salary.toLocaleString()} ₽
                                             </td>
+                                            <td>
+                                                {client.loans_count} ·{' '}
+                                                {client.loans_outstanding.toLocaleString()} ₽
+                                                {client.loans_overdue_amount > 0 && (
+                                                    <Badge variant="danger">
+                                                        {client.loans_overdue_amount.toLocaleString()} ₽
+                                                    </Badge>
+                                                )}
+                                            </td>
+                                            <td>
+                                                {client.deposits_count} ·{' '}
+                                                {client.deposits_balance.toLocaleString()} ₽
+                                            </td>
                                             <td>
                                                 {client.is_bankrupt ? (
                                                     <Badge variant="danger">
@@ -4,7 +4,7 @@ import axios, { type AxiosError, type AxiosResponse, type InternalAxiosRequestCo
 // API CLIENT - Axios Instance with Interceptors
 // ============================================
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
+export const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
 
 // Create axios instance
 export const api = axios.create({
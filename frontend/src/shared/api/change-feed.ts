@@ -0,0 +1,48 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE_URL } from './api';
+
+// ============================================
+// CHANGE FEED - Server-Sent Events from GET /events
+// ============================================
+
+export interface ChangeEvent {
+    entity: 'client' | 'loan' | 'deposit';
+    op: 'created' | 'updated' | 'deleted' | 'archived';
+    id: number;
+    client_id: number;
+}
+
+interface ChangeFeedHandlers {
+    onChange: (event: ChangeEvent) => void;
+    // Events may have been missed (reconnect, lagging): refetch everything
+    onReset?: () => void;
+}
+
+// Follow changes of the given clients (all clients when omitted, none for []).
+// EventSource reconnects by itself and resumes from the last event it saw.
+export const useChangeFeed = (handlers: ChangeFeedHandlers, clientIds?: number[]) => {
+    const handlersRef = useRef(handlers);
+    useEffect(() => {
+        handlersRef.current = handlers;
+    });
+
+    const clients = clientIds?.join(',');
+
+    useEffect(() => {
+        if (clients === '') return;
+
+        const url = new URL(`${API_BASE_URL}/events`, window.location.href);
+        if (clients !== undefined) {
+            url.searchParams.set('clients', clients);
+        }
+
+        const source = new EventSource(url);
+        source.addEventListener('change', (event) => {
+            handlersRef.current.onChange(JSON.parse((event as MessageEvent).data));
+        });
+        source.addEventListener('reset', () => {
+            handlersRef.current.onReset?.();
+        });
+        return () => source.close();
+    }, [clients]);
+};
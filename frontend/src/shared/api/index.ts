@@ -1,2 +1,4 @@
 export { api, getApiErrorMessage } from './api';
+export { useChangeFeed } from './change-feed';
+export type { ChangeEvent } from './change-feed';
 export type { ApiError } from './api';
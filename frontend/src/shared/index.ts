@@ -1,8 +1,8 @@
 // Shared layer exports
 
 // API
-export { api, getApiErrorMessage } from './api';
-export type { ApiError } from './api';
+export { api, getApiErrorMessage, useChangeFeed } from './api';
+export type { ApiError, ChangeEvent } from './api';
 
 // UI Components
 export {